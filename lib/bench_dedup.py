@@ -0,0 +1,109 @@
+"""
+Scaling benchmark of the near-duplicate index (dedup_index.py).
+
+    python bench_dedup.py                      # 1k, 10k, 100k synthetic entries
+    python bench_dedup.py --sizes 200000 --threshold 0.9
+
+A synthetic corpus of N entries is built from the clauses in laws_json_file/: a third are
+near-duplicates of a real clause (a few words replaced, like two editions of the same
+act), a few are exact copies, and the rest are unique clauses shuffled from the corpus
+vocabulary. Reported per size:
+- index time and entries/sec (it should grow roughly linearly with N),
+- the same work done pairwise, extrapolated from timing exact Jaccard on a sample,
+- recall on the planted near-duplicates whose exact shingle Jaccard similarity to their
+  original reaches the threshold (the ones the index is meant to catch), and how many
+  unique clauses were wrongly merged.
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+from dedup_index import DEFAULT_THRESHOLD, DedupIndex, normalize, shingle_hashes
+from law_io import iter_entries
+
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+EDIT_RATE = 0.03          # share of words replaced in a planted near-duplicate
+PAIRWISE_SAMPLE = 1500
+
+
+def corpus_texts() -> list:
+    texts = [entry["text"] for path in sorted(glob.glob(os.path.join(LIB_DIR, "laws_json_file", "*.json")))
+             for entry in iter_entries(path)]
+    # Planted near-duplicates must be long enough that a 3% edit keeps them above threshold
+    return [t for t in texts if len(t.split()) >= 30]
+
+
+def synthetic(n: int, seed: int = 0):
+    """(texts, {planted near-duplicate id: id of its original}, ids of unique clauses)."""
+    rng = random.Random(seed)
+    base = corpus_texts()
+    vocabulary = [w for t in base for w in t.split()]
+    texts, planted, unique = [], {}, []
+    originals = []
+    while len(texts) < n:
+        roll = rng.random()
+        if roll < 0.33 and originals:
+            source = rng.choice(originals)
+            words = texts[source].split()
+            for _ in range(max(1, int(len(words) * EDIT_RATE))):
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            planted[len(texts)] = source
+            texts.append(" ".join(words))
+        elif roll < 0.36 and originals:
+            texts.append(texts[rng.choice(originals)])
+        else:
+            length = rng.randint(30, 120)
+            start = rng.randrange(len(vocabulary) - length)
+            words = vocabulary[start:start + length]
+            rng.shuffle(words)
+            originals.append(len(texts))
+            unique.append(len(texts))
+            texts.append(" ".join(words))
+    return texts, planted, unique
+
+
+def jaccard(a: str, b: str) -> float:
+    a, b = shingle_hashes(normalize(a)), shingle_hashes(normalize(b))
+    return len(a & b) / (len(a | b) or 1)
+
+
+def pairwise_seconds(texts: list) -> float:
+    """Exact Jaccard over every pair of a sample, scaled to all pairs of `texts`."""
+    sample = [shingle_hashes(normalize(t)) for t in texts[:PAIRWISE_SAMPLE]]
+    start = time.perf_counter()
+    for i, a in enumerate(sample):
+        for b in sample[i + 1:]:
+            len(a & b) / (len(a | b) or 1)
+    elapsed = time.perf_counter() - start
+    pairs_done = len(sample) * (len(sample) - 1) / 2
+    pairs_all = len(texts) * (len(texts) - 1) / 2
+    return elapsed / pairs_done * pairs_all
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        texts, planted, unique = synthetic(n)
+        start = time.perf_counter()
+        index = DedupIndex(args.threshold)
+        for text in texts:
+            index.add(text)
+        elapsed = time.perf_counter() - start
+
+        expected = [i for i, src in planted.items() if jaccard(texts[i], texts[src]) >= args.threshold]
+        found = sum(index.canonical(i) == index.canonical(planted[i]) for i in expected)
+        roots = {}
+        for i in unique:
+            roots.setdefault(index.canonical(i), []).append(i)
+        merged = sum(len(ids) - 1 for ids in roots.values())
+        pairwise = pairwise_seconds(texts)
+        print(f"n={n:<7} index {elapsed:8.2f}s  {n / elapsed:8.0f} entries/s  "
+              f"pairwise ≈{pairwise:10.1f}s (x{pairwise / elapsed:.0f})  "
+              f"recall {found / max(1, len(expected)):.3f} of {len(expected)}  "
+              f"unique clauses merged {merged}/{len(unique)}")
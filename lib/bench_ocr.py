@@ -0,0 +1,127 @@
+"""
+Benchmark the OCR stage.
+
+Throughput (pages/sec) against the number of pool workers:
+    python bench_ocr.py laws_pdf_file/EU_Digital_Service_Act.pdf --workers 1 2 4 8
+
+Peak memory of whole-document rasterization vs. the streaming batches:
+    python bench_ocr.py laws_pdf_file/EU_Digital_Service_Act.pdf --memory --batch-sizes 1 4 16
+
+Cold (empty OCR cache) vs. warm (cached) run, in a temporary cache so yours is untouched:
+    python bench_ocr.py laws_pdf_file/EU_Digital_Service_Act.pdf --cache
+
+Every run is compared with the first run's text and must be byte-identical.
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+
+from pdf2image import convert_from_path
+
+from ocr_pages import DEFAULT_DPI, ocr_page, ocr_pdf_pages, join_pages
+
+
+def bench(pdf_file: str, worker_counts):
+    baseline = None
+    rows = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        page_texts = ocr_pdf_pages(pdf_file, workers=workers, cache=False)
+        elapsed = time.perf_counter() - start
+
+        text = join_pages(page_texts)
+        if baseline is None:
+            baseline = text
+        identical = text == baseline
+
+        rows.append((workers, len(page_texts), elapsed, identical))
+        print(f"workers={workers:<3} pages={len(page_texts):<4} "
+              f"{elapsed:8.2f}s  {len(page_texts) / elapsed:6.2f} pages/sec  "
+              f"{'identical' if identical else 'MISMATCH'}")
+    return rows
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(conn, pdf_file: str, batch_size):
+    # Runs in a fresh process so each mode starts from the same baseline RSS
+    if batch_size is None:
+        # The original approach: rasterize the whole document, then OCR it
+        pages = convert_from_path(pdf_file, dpi=DEFAULT_DPI)
+        page_texts = [ocr_page(page) for page in pages]
+    else:
+        page_texts = ocr_pdf_pages(pdf_file, workers=1, batch_size=batch_size, cache=False)
+    conn.send((join_pages(page_texts), len(page_texts), _peak_rss_mb()))
+    conn.close()
+
+
+def bench_memory(pdf_file: str, batch_sizes):
+    baseline = None
+    rows = []
+    for batch_size in [None] + list(batch_sizes):
+        parent, child = multiprocessing.Pipe(duplex=False)
+        proc = multiprocessing.Process(target=_measure, args=(child, pdf_file, batch_size))
+        proc.start()
+        text, pages, peak_mb = parent.recv()
+        proc.join()
+
+        if baseline is None:
+            baseline = text
+        identical = text == baseline
+
+        label = "whole document" if batch_size is None else f"batch_size={batch_size}"
+        rows.append((label, pages, peak_mb, identical))
+        print(f"{label:<16} pages={pages:<4} peak RSS {peak_mb:8.1f} MB  "
+              f"{'identical' if identical else 'MISMATCH'}")
+    return rows
+
+
+def bench_cache(pdf_file: str):
+    rows = []
+    baseline = None
+    # A fresh cache directory: the shared one may still know these pages by fingerprint
+    # (from this PDF or another edition of it), which would make the cold run warm
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("cold cache", "warm cache"):
+            start = time.perf_counter()
+            page_texts = ocr_pdf_pages(pdf_file, cache_dir=cache_dir)
+            elapsed = time.perf_counter() - start
+
+            text = join_pages(page_texts)
+            if baseline is None:
+                baseline = text
+            identical = text == baseline
+
+            rows.append((label, len(page_texts), elapsed, identical))
+            print(f"{label:<11} pages={len(page_texts):<4} {elapsed:8.2f}s  "
+                  f"{'identical' if identical else 'MISMATCH'}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf_file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="worker counts to try; the first one is the reference output")
+    parser.add_argument("--memory", action="store_true",
+                        help="measure peak RSS of whole-document vs. streaming rasterization instead")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--cache", action="store_true",
+                        help="time a cold run (empty temporary cache) against a warm one instead")
+    args = parser.parse_args()
+
+    if args.cache:
+        rows = bench_cache(args.pdf_file)
+    elif args.memory:
+        rows = bench_memory(args.pdf_file, args.batch_sizes)
+    else:
+        rows = bench(args.pdf_file, args.workers)
+    if not all(identical for *_, identical in rows):
+        raise SystemExit("❌ OCR output differs from the reference run")
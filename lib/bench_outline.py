@@ -0,0 +1,45 @@
+"""
+Throughput of the hierarchical US Code parser (law_parser.iter_us_code) on large titles.
+
+    python bench_outline.py                    # 1x, 10x, 100x, 1000x the bundled section
+    python bench_outline.py --scales 1 5000
+
+A "title" at scale N is N back-to-back copies of
+laws_pdf_file/US_Reporting_requirements_of_providers.txt, so throughput should stay flat
+as N grows and the entry count should grow exactly N-fold.
+"""
+import argparse
+import os
+import time
+
+from law_parser import iter_us_code
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "laws_pdf_file", "US_Reporting_requirements_of_providers.txt")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    with open(SOURCE, "r", encoding="utf-8") as f:
+        section = f.read().rstrip("\n") + "\n"
+
+    base_entries = None
+    for scale in args.scales:
+        text = section * scale
+        start = time.perf_counter()
+        entries = 0
+        longest = 0
+        for entry in iter_us_code(text, "bench"):
+            entries += 1
+            longest = max(longest, entry["word_count"])
+        elapsed = time.perf_counter() - start
+
+        base_entries = base_entries or entries // scale
+        lines = text.count("\n")
+        mb = len(text.encode("utf-8")) / (1024 * 1024)
+        print(f"x{scale:<5} {mb:8.2f} MB  {lines:>8} lines  {entries:>7} entries  {elapsed:7.3f}s  "
+              f"{mb / elapsed:6.2f} MB/s  {entries / elapsed:10.0f} entries/s  longest {longest} words"
+              f"{'' if entries == base_entries * scale else '  ❌ entry count not linear'}")
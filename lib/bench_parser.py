@@ -0,0 +1,192 @@
+"""
+Microbenchmark of the shared single-pass parser (law_parser.py) against the original
+per-script split/finditer code, on the bundled corpus.
+
+    python bench_parser.py            # every document in laws_pdf_file/
+    python bench_parser.py --repeat 50
+
+PDF text comes from read_pdf_pages (text layer, or the OCR cache), so after one ingestion
+run no Tesseract is needed. Both implementations must produce identical entries, and the
+US Reporting "us_code" entries must equal laws_json_file/US_Reporting_requirements_of_providers.json.
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from law_parser import PROFILES, parse_document
+
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (source, kb title, profile) for every document in laws_pdf_file/
+CORPUS = [
+    ("California_state_law.pdf", "California_state_law", "california"),
+    ("EU_Digital_Service_Act.pdf", "EU_Digital_Service", "california"),
+    ("The_Florida_Senate.pdf", "The_Florida_Senate", "california"),
+    ("Utah_Social_Media_Regulation_Act.pdf", "Utah_Social_Media_Regulation_Act", "california"),
+    ("EU_Digital_Service_Act_Copy.pdf", "EU_Digital_Service_Act_Copy", "eu"),
+    ("US_Reporting_requirements_of_providers.txt", "US_Reporting_requirements_of_providers", "us_outline"),
+]
+
+
+# --- The original implementations, kept here only as the reference to compare against ---
+
+def _legacy_clean(s, footers=True):
+    if footers:
+        s = re.sub(r'—\s*\d+\s*—\s*Ch\.\s*\d+', ' ', s)
+    return re.sub(r'\s+', ' ', s).strip()
+
+
+def _legacy_wc(text):
+    return len(re.findall(r'\b[\w\-]+\b', text))
+
+
+def _legacy_after(text, phrase):
+    idx = text.find(phrase)
+    return text[idx + len(phrase):].strip() if idx != -1 else text
+
+
+def _legacy_sections(text, kb, enactment, min_words=2):
+    hdr_re = re.compile(r'(?:SEC\.?\s*\d+|SECTION\s+\d+|Section\s+\d+)', re.IGNORECASE)
+    marker_re = re.compile(r'\(\s*(?:[a-z]{1,2}|\d{1,3}|ix|iv|v?i{0,3})\s*\)\s+')
+    text = _legacy_after(_legacy_clean(text), enactment)
+    entries, section = [], None
+    for part in re.split(f'({hdr_re.pattern})', text):
+        if not part or not part.strip():
+            continue
+        part = part.strip()
+        if hdr_re.fullmatch(part):
+            section = part
+            continue
+        if not section:
+            continue
+        markers = list(marker_re.finditer(part))
+        for i, m in enumerate(markers):
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(part)
+            body = _legacy_clean(re.sub(r'^[–—-]\s*', '', part[m.end():end].strip()))
+            if _legacy_wc(body) >= min_words:
+                entries.append({"kb": kb, "article_number": m.group(0).strip().strip("() "),
+                                "type": section, "text": body, "word_count": _legacy_wc(body)})
+    return entries
+
+
+def _legacy_articles(text, kb, enactment):
+    hdr_re = re.compile(r'\bArticle\s+(\d+)\b', re.IGNORECASE)
+    num_re = re.compile(r'^\s*(\d+)\.\s+', re.MULTILINE)
+
+    def numbered(article_text, header):
+        out = []
+        matches = list(num_re.finditer(article_text))
+        for i, m in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(article_text)
+            body = article_text[m.end():end].strip()
+            if _legacy_wc(body) >= 2:
+                out.append({"kb": kb, "article number": m.group(1), "type": header,
+                            "text": body, "word count": _legacy_wc(body)})
+        return out
+
+    text = _legacy_after(_legacy_clean(text, footers=False), enactment)
+    results, header, lines = [], None, []
+    for part in re.split(f'({hdr_re.pattern})', text):
+        part = part.strip()
+        if not part:
+            continue
+        m = hdr_re.match(part)
+        if m:
+            if header and lines:
+                results.extend(numbered("\n".join(lines), header))
+            header, lines = f"Article {m.group(1)}", []
+        else:
+            lines.append(part)
+    if header and lines:
+        results.extend(numbered("\n".join(lines), header))
+    return results
+
+
+def _legacy_outline(text, kb, merge):
+    marker_re = re.compile(r'^\(?([a-z])\)\s*(.*)', re.IGNORECASE)
+    raw, article, lines = [], None, []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        m = marker_re.match(line)
+        if m:
+            if article and lines:
+                raw.append((article, " ".join(lines).strip()))
+            article, lines = m.group(1), [m.group(2)]
+        else:
+            lines.append(line)
+    if article and lines:
+        raw.append((article, " ".join(lines).strip()))
+
+    def entry(marker, body):
+        return {"kb": kb, "article_number": marker, "type": "Section " + marker,
+                "text": body.strip(), "word_count": len(body.split())}
+
+    if not merge:
+        return [entry(marker, body) for marker, body in raw]
+    results, marker, buf = [], None, ""
+    for m, body in raw:
+        marker = marker or m
+        buf += (" " + body).strip()
+        if re.search(r'[.?!]$', buf):
+            results.append(entry(marker, buf))
+            marker, buf = None, ""
+    if buf:
+        results.append(entry(marker or "?", buf))
+    return results
+
+
+def legacy_parse(profile, text, kb):
+    options = PROFILES[profile]["options"]
+    if profile == "california":
+        return _legacy_sections(text, kb, options["enactment"])
+    if profile == "eu":
+        return _legacy_articles(text, kb, options["enactment"])
+    return _legacy_outline(text, kb, options["merge"])
+
+
+def load_text(source: str) -> str:
+    path = os.path.join(LIB_DIR, "laws_pdf_file", source)
+    if source.endswith(".txt"):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    from ocr_pages import read_pdf_pages, join_pages
+    return join_pages(read_pdf_pages(path)[0])
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per document; the best time is kept")
+    args = parser.parse_args()
+
+    failed = False
+    for source, kb, profile in CORPUS:
+        text = load_text(source)
+        new = parse_document(profile, text, kb)
+        old = legacy_parse(profile, text, kb)
+        ok = new == old
+        if source.endswith(".txt"):
+            with open(os.path.join(LIB_DIR, "laws_json_file", source.replace(".txt", ".json")), encoding="utf-8") as f:
+                ok = ok and parse_document("us_code", text, kb) == json.load(f)
+        failed = failed or not ok
+
+        old_s = best_of(lambda: legacy_parse(profile, text, kb), args.repeat)
+        new_s = best_of(lambda: parse_document(profile, text, kb), args.repeat)
+        print(f"{source:<44} {profile:<11} chars={len(text):<7} entries={len(new):<4} "
+              f"original {old_s * 1000:7.2f}ms  single-pass {new_s * 1000:7.2f}ms  "
+              f"x{old_s / new_s:.2f}  {'identical' if ok else 'MISMATCH'}")
+
+    if failed:
+        raise SystemExit("❌ Shared parser output differs from the original code")
@@ -0,0 +1,86 @@
+"""
+Benchmark the OCR preprocessing stage (ocr_preprocess.py) against raw pages.
+
+    python bench_preprocess.py                                   # every PDF in laws_pdf_file/
+    python bench_preprocess.py laws_pdf_file/The_Florida_Senate.pdf --steps grayscale binarize
+    python bench_preprocess.py --workers 4
+
+For each PDF every page is OCR'd twice with the cache bypassed: as rendered (the current
+output) and after the given steps. Reported per document:
+- seconds/page for both runs,
+- word-level similarity of the preprocessed text to the current output,
+- word accuracy of both runs against the PDF's own text layer, on the pages that have one
+  (the only ground truth we have), and the delta,
+- how many "— 2 — Ch. 321" footers clean_noise would still have to scrub.
+
+Both runs render at ocr_pages.DEFAULT_DPI. "rescale" resamples that bitmap rather than
+rendering at another DPI, so its numbers measure resampling; they say nothing about what
+rendering at a different read_pdf_pages(dpi=...) would give. Steps keep the page in colour
+unless "grayscale" (or "binarize") is among them.
+"""
+import argparse
+import difflib
+import glob
+import os
+import time
+
+from law_parser import FOOTER_RE
+from ocr_pages import extract_text_layer, has_text_layer, ocr_pdf_pages
+from ocr_preprocess import STEPS
+
+PDF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "laws_pdf_file")
+
+
+def word_similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a.split(), b.split(), autojunk=False).ratio()
+
+
+def timed_ocr(pdf_file: str, workers: int, preprocess) -> tuple:
+    start = time.perf_counter()
+    pages = ocr_pdf_pages(pdf_file, workers=workers, cache=False, preprocess=preprocess)
+    return pages, time.perf_counter() - start
+
+
+def bench(pdf_file: str, steps, workers: int) -> dict:
+    raw_pages, raw_s = timed_ocr(pdf_file, workers, ())
+    pre_pages, pre_s = timed_ocr(pdf_file, workers, steps)
+    count = len(raw_pages)
+
+    truth = extract_text_layer(pdf_file)
+    scored = [n for n in range(min(count, len(truth))) if has_text_layer(truth[n])]
+    raw_acc = sum(word_similarity(raw_pages[n], truth[n]) for n in scored) / len(scored) if scored else None
+    pre_acc = sum(word_similarity(pre_pages[n], truth[n]) for n in scored) / len(scored) if scored else None
+
+    row = {
+        "pages": count,
+        "raw_s_per_page": raw_s / count,
+        "pre_s_per_page": pre_s / count,
+        "similarity_to_current": sum(map(word_similarity, pre_pages, raw_pages)) / count,
+        "raw_accuracy": raw_acc,
+        "pre_accuracy": pre_acc,
+        "raw_footers": sum(len(FOOTER_RE.findall(t)) for t in raw_pages),
+        "pre_footers": sum(len(FOOTER_RE.findall(t)) for t in pre_pages),
+    }
+    accuracy = (f"accuracy {raw_acc:.3f} → {pre_acc:.3f} ({pre_acc - raw_acc:+.3f}) on {len(scored)} text-layer pages"
+                if scored else "no text layer to score against")
+    print(f"{os.path.basename(pdf_file):<40} pages={count:<4} "
+          f"raw {row['raw_s_per_page']:6.2f}s/page  preprocessed {row['pre_s_per_page']:6.2f}s/page  "
+          f"x{raw_s / pre_s:.2f}  same-as-current {row['similarity_to_current']:.3f}  {accuracy}  "
+          f"footers {row['raw_footers']} → {row['pre_footers']}")
+    return row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf_files", nargs="*")
+    parser.add_argument("--steps", nargs="+", choices=STEPS, default=list(STEPS))
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    pdf_files = args.pdf_files or sorted(glob.glob(os.path.join(PDF_DIR, "*.pdf")))
+    rows = [bench(pdf_file, tuple(args.steps), args.workers) for pdf_file in pdf_files]
+    pages = sum(r["pages"] for r in rows)
+    raw = sum(r["raw_s_per_page"] * r["pages"] for r in rows)
+    pre = sum(r["pre_s_per_page"] * r["pages"] for r in rows)
+    print(f"{'TOTAL':<40} pages={pages:<4} raw {raw / pages:6.2f}s/page  "
+          f"preprocessed {pre / pages:6.2f}s/page  x{raw / pre:.2f}  steps={','.join(args.steps)}")
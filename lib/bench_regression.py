@@ -0,0 +1,290 @@
+"""
+Regression and performance gate for the parsers, over the documents in laws_manifest.json.
+
+    python bench_regression.py                      # check against bench_baseline.json
+    python bench_regression.py --only The_Florida_Senate --scales 1 10 --tolerance 0.4
+    python bench_regression.py --report bench_report.json
+    python bench_regression.py --save-baseline      # after an intended speed/memory change
+    python bench_regression.py --refresh-fixtures   # after a PDF changed (needs poppler/Tesseract)
+
+Neither poppler nor Tesseract is needed: a .txt source is read as is, and a PDF's page
+text comes from its committed fixture, bench_fixtures/<name>.json (the per-page text
+read_pdf_pages returns, plus the sha256 of the PDF it was read from). A missing or stale
+fixture, a missing golden or a missing baseline entry fails the run like a regression.
+--refresh-fixtures rewrites the fixtures through read_pdf_pages on a machine with the
+OCR tools; rebuild the goldens with `python ingest_laws.py --force` afterwards, which reads
+the PDFs the same way and so publishes exactly what the fixtures parse to.
+
+Per document, the manifest profile is run through the same parse → write → delta path as
+ingest_laws.build_document and:
+- golden: the written entries must equal the committed laws_json_file/<output> (a document
+  that parses to no entries has none, as ingest_laws.py never publishes an empty output),
+- throughput: chars/sec and entries/sec, best of --repeat runs,
+- peak memory: tracemalloc peak of one extra run,
+- per-stage wall time (clean_noise, parse, write) from pipeline_stats,
+- scaling: the text repeated 10x and 100x; throughput falling to under a third of the
+  previous scale's means something in the parser is superlinear (a quadratic step loses
+  10x per scale; cache effects alone cost up to about 2x).
+
+Against the committed bench_baseline.json, a metric worse by more than --tolerance (default
+50%, shared CI runners are noisy) fails the run: lower throughput, higher peak memory or a
+slower stage (stages under 5ms are ignored). Every timed run is paired with a short
+calibration loop (regex + JSON work on a fixed text) and timings are compared in units of
+it, so the baseline carries over to a faster or slower runner and a noisy neighbour slows
+both sides alike; peak memory needs no scaling. A regression is re-measured once and only
+counts if it shows up again. Exits 1 on any mismatch, missing input or regression.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from entry_delta import EntryDelta
+from ingest_laws import LIB_DIR, MANIFEST, load_manifest
+from law_io import iter_entries, write_entries
+from law_parser import WORD_RE, clean_noise, iter_document
+from ocr_cache import file_sha256
+from pipeline_stats import RunStats, recording, stage, timed_iter
+
+BASELINE_FILE = os.path.join(LIB_DIR, "bench_baseline.json")
+FIXTURE_DIR = os.path.join(LIB_DIR, "bench_fixtures")
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_TOLERANCE = 0.5
+SUPERLINEAR_DROP = 1 / 3      # throughput must stay above a third of the previous scale's
+MIN_STAGE_SECONDS = 0.005
+MIN_REPEAT = 3                # timed runs at every scale; the best one counts
+
+
+def fixture_path(doc: dict) -> str:
+    return os.path.join(FIXTURE_DIR, os.path.splitext(os.path.basename(doc["source"]))[0] + ".json")
+
+
+def refresh_fixture(doc: dict) -> str:
+    """Read a PDF through the ingestion path (text layer, OCR cache, Tesseract) and save its pages."""
+    from ocr_pages import read_pdf_pages
+    page_texts, page_sources = read_pdf_pages(doc["source"], text_layer=doc.get("text_layer", True),
+                                              preprocess=tuple(doc.get("preprocess", ())))
+    path = fixture_path(doc)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"source": os.path.relpath(doc["source"], LIB_DIR), "source_sha256": file_sha256(doc["source"]),
+                   "pages": page_texts, "page_sources": page_sources}, f, indent=4, ensure_ascii=False)
+    return path
+
+
+def load_text(doc: dict):
+    """(full text, per-page sources or None) as ingest_laws.read_source would return them, without OCR tools."""
+    if not doc["source"].lower().endswith(".pdf"):
+        with open(doc["source"], "r", encoding="utf-8") as f:
+            return f.read(), None
+    from ocr_pages import join_pages
+    path = fixture_path(doc)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"no fixture {os.path.relpath(path, LIB_DIR)}; run with --refresh-fixtures")
+    with open(path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    if fixture["source_sha256"] != file_sha256(doc["source"]):
+        raise ValueError(f"{os.path.relpath(path, LIB_DIR)} was read from another version of the PDF; "
+                         f"run with --refresh-fixtures")
+    return join_pages(fixture["pages"]), fixture["page_sources"]
+
+
+def run_once(doc: dict, text: str, page_sources, out_file: str, stats: RunStats = None) -> int:
+    """Parse `text` with the document's profile and write the entries and their delta, as build_document does."""
+    options = {"min_words": doc["min_words"]} if "min_words" in doc else {}
+    entries = iter_document(doc["profile"], text, doc["kb"], **options)
+    if page_sources is not None:
+        from ocr_pages import with_source
+        entries = with_source(entries, page_sources)
+    with EntryDelta(out_file) as delta:
+        if stats is None:
+            count = write_entries(out_file, delta.track(entries))
+        else:
+            with recording(stats), stats.document(doc["kb"]):
+                with stage("write"):
+                    count = write_entries(out_file, timed_iter("parse", delta.track(entries)))
+        if count:
+            delta.write()
+    return count
+
+
+def measure(doc: dict, text: str, page_sources, out_file: str, repeat: int) -> dict:
+    best, best_stages, count, calibration = float("inf"), {}, 0, float("inf")
+    for _ in range(max(1, repeat)):
+        calibration = min(calibration, calibrate(repeat=3))
+        stats = RunStats()
+        start = time.perf_counter()
+        count = run_once(doc, text, page_sources, out_file, stats)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        # Each stage keeps its own best run: noise rarely hits every stage of every run
+        for name, record in stats.documents[doc["kb"]]["stages"].items():
+            best_stages[name] = min(best_stages.get(name, float("inf")), record["wall_s"])
+
+    tracemalloc.start()
+    try:
+        run_once(doc, text, page_sources, out_file)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "chars": len(text),
+        "entries": count,
+        "seconds": best,
+        "chars_per_s": len(text) / best,
+        "entries_per_s": count / best,
+        "peak_kb": round(peak / 1024, 1),
+        "stages": best_stages,
+        "calibration_s": calibration,
+    }
+
+
+def golden_diff(out_file: str, golden_file: str):
+    """None when the written entries equal the golden file's, else a short description."""
+    current, golden = list(iter_entries(out_file)), list(iter_entries(golden_file))
+    for i, (a, b) in enumerate(zip(current, golden)):
+        if a != b:
+            return f"entry {i} differs: {a.get('type')} {a.get('article_number', a.get('article number'))}"
+    if len(current) != len(golden):
+        return f"{len(current)} entries, golden has {len(golden)}"
+    return None
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Best-of time of a fixed regex + JSON workload, the unit timings are compared in."""
+    text = "Article 12 — 2 — Ch. 321 The provider shall, (a) without undue delay, notify; " * 4000
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        words = WORD_RE.findall(clean_noise(text))
+        json.dumps([{"text": " ".join(words[i:i + 40])} for i in range(0, len(words), 40)], indent=4)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def regressions(result: dict, base: dict, tolerance: float) -> list:
+    """What got worse than `base` by more than `tolerance`, timings in calibration units."""
+    speed = result["calibration_s"] / base["calibration_s"]     # 2.0: this run went half as fast
+    problems = []
+    for key in ("chars_per_s", "entries_per_s"):
+        expected = base.get(key, 0) / speed
+        if expected and result[key] < expected * (1 - tolerance):
+            problems.append(f"{key} {result[key]:.0f} < baseline {expected:.0f}")
+    if base.get("peak_kb") and result["peak_kb"] > base["peak_kb"] * (1 + tolerance):
+        problems.append(f"peak {result['peak_kb']:.0f} KB > baseline {base['peak_kb']:.0f} KB")
+    for name, seconds in base.get("stages", {}).items():
+        current = result["stages"].get(name, 0.0)
+        seconds *= speed
+        if seconds >= MIN_STAGE_SECONDS and current > seconds * (1 + tolerance):
+            problems.append(f"{name} {current * 1000:.1f}ms > baseline {seconds * 1000:.1f}ms")
+    return problems
+
+
+def load_baseline(path: str) -> dict:
+    """{"<file> x<scale>": measurement}, or {} when there is no baseline yet."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def format_result(key: str, result: dict) -> str:
+    stages = "  ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in
+                       sorted(result["stages"].items(), key=lambda s: -s[1]))
+    return (f"{key:<48} chars={result['chars']:<9} entries={result['entries']:<6} "
+            f"{result['chars_per_s'] / 1e6:6.2f} Mchars/s {result['entries_per_s']:9.0f} entries/s "
+            f"peak {result['peak_kb']:9.1f} KB  {stages}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", default=MANIFEST)
+    parser.add_argument("--only", nargs="+", metavar="KB", help="restrict to these kb titles")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs at x1 (fewer at larger scales, never under 3)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run's numbers as the baseline")
+    parser.add_argument("--report", metavar="FILE", help="write every measurement (JSON) here")
+    parser.add_argument("--refresh-fixtures", action="store_true",
+                        help="re-read the PDFs (text layer / OCR) into bench_fixtures/ and exit")
+    args = parser.parse_args()
+
+    docs = load_manifest(args.manifest)
+    if args.only:
+        docs = [doc for doc in docs if doc["kb"] in args.only]
+    if args.refresh_fixtures:
+        for doc in docs:
+            if doc["source"].lower().endswith(".pdf"):
+                print(f"✅ Fixture → {os.path.relpath(refresh_fixture(doc), LIB_DIR)}")
+        raise SystemExit(0)
+
+    baseline = load_baseline(args.baseline)
+    results, failures = {}, []
+    if not baseline and not args.save_baseline:
+        failures.append(f"no baseline at {args.baseline}; record one with --save-baseline")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for doc in docs:
+            name = os.path.basename(doc["output"])
+            try:
+                text, page_sources = load_text(doc)
+            except (OSError, ValueError) as err:
+                failures.append(f"{name}: {err}")
+                continue
+            out_file = os.path.join(tmp, name)
+
+            run_once(doc, text, page_sources, out_file)       # warm-up: imports, regex and encoder caches, disk
+            previous = None             # (scale, chars per calibration unit)
+            for scale in args.scales:
+                key = f"{name} x{scale}"
+                repeat = max(MIN_REPEAT, args.repeat // scale)
+                result = results[key] = measure(doc, text * scale, page_sources, out_file, repeat)
+                rate = result["chars_per_s"] * result["calibration_s"]
+                print(format_result(key, result))
+
+                if scale == 1:
+                    if not os.path.exists(doc["output"]):
+                        # The pipeline never publishes a document that parses to no entries
+                        if result["entries"]:
+                            failures.append(f"{name}: no golden copy in laws_json_file/")
+                    else:
+                        diff = golden_diff(out_file, doc["output"])
+                        if diff:
+                            failures.append(f"{name}: golden mismatch, {diff}")
+                if previous and rate < previous[1] * SUPERLINEAR_DROP:
+                    failures.append(f"{key}: throughput {rate / previous[1]:.2f}x that at x{previous[0]} "
+                                    f"(superlinear)")
+                previous = scale, rate
+                if args.save_baseline or not baseline:
+                    continue
+                if key not in baseline:
+                    failures.append(f"{key}: not in the baseline; record it with --save-baseline")
+                    continue
+                problems = regressions(result, baseline[key], args.tolerance)
+                if problems:
+                    # Shared runners have noisy moments: a regression must show up twice
+                    result = results[key] = measure(doc, text * scale, page_sources, out_file, repeat)
+                    problems = regressions(result, baseline[key], args.tolerance)
+                failures += [f"{key}: {problem}" for problem in problems]
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"📊 Measurements → {args.report}")
+    if args.save_baseline:
+        tmp = args.baseline + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({**baseline, **results}, f, indent=4)
+        os.replace(tmp, args.baseline)
+        print(f"✅ Baseline → {args.baseline}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        raise SystemExit(1)
+    print(f"✅ {len(results)} measurements, no golden mismatch or regression")
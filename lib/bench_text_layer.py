@@ -0,0 +1,48 @@
+"""
+Benchmark the text-layer fast path against OCR-ing every page.
+
+    python bench_text_layer.py                       # every PDF in laws_pdf_file/
+    python bench_text_layer.py laws_pdf_file/The_Florida_Senate.pdf --workers 4
+
+Both runs bypass the OCR cache so the numbers are real Tesseract time.
+"""
+import argparse
+import glob
+import os
+import time
+
+from ocr_pages import read_pdf_pages
+
+PDF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "laws_pdf_file")
+
+
+def bench(pdf_file: str, workers: int):
+    start = time.perf_counter()
+    ocr_texts, _ = read_pdf_pages(pdf_file, workers=workers, cache=False, text_layer=False)
+    ocr_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast_texts, sources = read_pdf_pages(pdf_file, workers=workers, cache=False, text_layer=True)
+    fast_s = time.perf_counter() - start
+
+    text_pages = sources.count("text")
+    print(f"{os.path.basename(pdf_file):<40} pages={len(sources):<4} text-layer={text_pages:<4} "
+          f"ocr={len(sources) - text_pages:<4} all-OCR {ocr_s:8.2f}s  fast path {fast_s:8.2f}s  "
+          f"speedup x{ocr_s / fast_s:.1f}")
+    return ocr_s, fast_s
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf_files", nargs="*")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    pdf_files = args.pdf_files or sorted(glob.glob(os.path.join(PDF_DIR, "*.pdf")))
+    total_ocr = total_fast = 0.0
+    for pdf_file in pdf_files:
+        ocr_s, fast_s = bench(pdf_file, args.workers)
+        total_ocr += ocr_s
+        total_fast += fast_s
+    print(f"{'TOTAL':<40} all-OCR {total_ocr:8.2f}s  fast path {total_fast:8.2f}s  "
+          f"speedup x{total_ocr / total_fast:.1f}")
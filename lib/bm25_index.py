@@ -0,0 +1,345 @@
+"""
+Local BM25 keyword index over the parsed law entries, for pre-filtering or answering simple
+lookups without an embedding round trip.
+
+    python bm25_index.py build                                  # every output ingest_laws.py publishes
+    python bm25_index.py query "parental consent minor account" -k 5
+    python bm25_index.py query "transparency reporting" --kb EU_Digital_Service --type "SECTION 6"
+    python bm25_index.py query "provider report" --article "(a)(1)"      # (a)(1) and its sub-paragraphs
+
+    from bm25_index import open_index
+    with open_index() as index:
+        for hit in index.search("age verification", k=10, kb="Utah_Social_Media_Regulation_Act"):
+            print(hit.score, hit.kb, hit.type, hit.article_number)
+
+Entries are tokenised with law_parser.WORD_RE, the same pattern as word_count, lower-cased.
+ingest_laws.py rebuilds the index as its last stage over the published outputs (the manifest's
+and ingest_daemon.py's, see ingest_laws.published_outputs), so .lawc copies or dedup reports
+sitting in laws_json_file/ are never indexed twice.
+
+File layout (laws_json_file/search/bm25.idx): b"BM25" + u32 version + u32 header length +
+JSON header, then 8-byte-aligned little-endian sections:
+- terms:     the sorted vocabulary as one UTF-8 blob + u32 offsets (binary-searched in place),
+- postings:  per term, u32 doc ids and u16 term frequencies in two parallel runs, located by
+             u64 start offsets; a query reads just its terms' runs through memoryview casts,
+- docs:      per entry u32 length, kb id, type id, article id, source file id and row,
+- strings:   kb / type / article number / source path table.
+Opening maps the file and reads only the header, so a query costs a few binary searches
+plus one pass over the matching postings.
+"""
+import argparse
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import Counter, namedtuple
+
+from law_io import iter_entries
+from law_parser import WORD_RE
+
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = os.path.join(LIB_DIR, "laws_json_file", "search", "bm25.idx")
+
+MAGIC = b"BM25"
+VERSION = 1
+K1 = 1.2
+B = 0.75
+MAX_TF = 0xFFFF
+DOC_FIELDS = ("length", "kb", "type", "article", "source", "row")
+_LITTLE = sys.byteorder == "little"
+
+Hit = namedtuple("Hit", "score doc kb type article_number source row")
+
+
+def tokenize(text: str) -> list:
+    return WORD_RE.findall(text.lower())
+
+
+def article_matches(number: str, article: str) -> bool:
+    """`number` is `article` or one of its sub-paragraphs: "(a)(1)" matches "(a)(1)(A)", not "(a)(10)"."""
+    return number == article or (number.startswith(article) and number[len(article)] == "(")
+
+
+def _le(values: array) -> bytes:
+    if not _LITTLE:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _align(position: int) -> int:
+    return (position + 7) & ~7
+
+
+def _string_table(strings: list):
+    blob = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for data in blob:
+        offsets.append(offsets[-1] + len(data))
+    return b"".join(blob), offsets
+
+
+def build_index(paths: list, index_file: str = INDEX_FILE) -> int:
+    """Index every entry of `paths` into `index_file` (written atomically). Returns the entry count."""
+    strings, string_ids = [], {}
+
+    def intern(value) -> int:
+        value = "" if value is None else str(value)
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    postings = {}                            # term -> (array of doc ids, array of tfs)
+    docs = {field: array("I") for field in DOC_FIELDS}
+    doc_id = 0
+    for path in paths:
+        source = intern(os.path.relpath(path, os.path.dirname(index_file)))
+        for row, entry in enumerate(iter_entries(path)):
+            tokens = tokenize(entry.get("text", ""))
+            for term, tf in Counter(tokens).items():
+                ids_tfs = postings.get(term)
+                if ids_tfs is None:
+                    ids_tfs = postings[term] = (array("I"), array("H"))
+                ids_tfs[0].append(doc_id)
+                ids_tfs[1].append(min(tf, MAX_TF))
+            docs["length"].append(len(tokens))
+            docs["kb"].append(intern(entry.get("kb")))
+            docs["type"].append(intern(entry.get("type")))
+            docs["article"].append(intern(entry.get("article_number", entry.get("article number"))))
+            docs["source"].append(source)
+            docs["row"].append(row)
+            doc_id += 1
+
+    terms = sorted(postings)
+    term_blob, term_offsets = _string_table(terms)
+    string_blob, string_offsets = _string_table(strings)
+    doc_ids, tfs, starts = array("I"), array("H"), array("Q", [0])
+    for term in terms:
+        ids, counts = postings[term]
+        doc_ids.extend(ids)
+        tfs.extend(counts)
+        starts.append(len(doc_ids))
+
+    sections = [("terms", term_blob), ("term_offsets", _le(term_offsets)), ("posting_starts", _le(starts)),
+                ("doc_ids", _le(doc_ids)), ("tfs", _le(tfs)),
+                ("strings", string_blob), ("string_offsets", _le(string_offsets))]
+    sections += [(f"doc_{field}", _le(docs[field])) for field in DOC_FIELDS]
+
+    total_length = sum(docs["length"])
+    header = {"docs": doc_id, "terms": len(terms), "avg_length": total_length / doc_id if doc_id else 0.0,
+              "sections": {}}
+    header_len = 0
+    while True:                              # offsets depend on the header's own length
+        position = _align(12 + header_len)
+        for name, data in sections:
+            header["sections"][name] = [position, len(data)]
+            position = _align(position + len(data))
+        encoded = json.dumps(header).encode("utf-8")
+        if len(encoded) == header_len:
+            break
+        header_len = len(encoded)
+
+    os.makedirs(os.path.dirname(index_file) or ".", exist_ok=True)
+    tmp = f"{index_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<II", VERSION, header_len) + encoded)
+            for name, data in sections:
+                f.write(b"\0" * (header["sections"][name][0] - f.tell()))
+                f.write(data)
+        os.replace(tmp, index_file)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return doc_id
+
+
+class BM25Index:
+    """A memory-mapped bm25.idx; see search()."""
+
+    def __init__(self, index_file: str = INDEX_FILE):
+        self.index_file = index_file
+        with open(index_file, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if bytes(self._view[:4]) != MAGIC:
+            raise ValueError(f"{index_file} is not a BM25 index")
+        version, header_len = struct.unpack_from("<II", self._view, 4)
+        if version != VERSION:
+            raise ValueError(f"{index_file}: unsupported index version {version}")
+        header = json.loads(bytes(self._view[12:12 + header_len]))
+
+        self.doc_count = header["docs"]
+        self.term_count = header["terms"]
+        self.avg_length = header["avg_length"] or 1.0
+        self._sections = header["sections"]
+        self._terms = self._bytes("terms")
+        self._term_offsets = self._column("term_offsets", "I")
+        self._starts = self._column("posting_starts", "Q")
+        self._doc_ids = self._column("doc_ids", "I")
+        self._tfs = self._column("tfs", "H")
+        self._strings = self._bytes("strings")
+        self._string_offsets = self._column("string_offsets", "I")
+        self._docs = {field: self._column(f"doc_{field}", "I") for field in DOC_FIELDS}
+        self._decoded = {}
+        self._ids = None                      # string -> id, built on first filtered query
+        self._loaded = {}                     # source file -> its entries, for entry()
+
+    def _bytes(self, section: str) -> memoryview:
+        start, length = self._sections[section]
+        return self._view[start:start + length]
+
+    def _column(self, section: str, typecode: str):
+        data = self._bytes(section)
+        if _LITTLE:
+            return data.cast(typecode)
+        values = array(typecode, data)
+        values.byteswap()
+        return values
+
+    def string(self, index: int) -> str:
+        value = self._decoded.get(index)
+        if value is None:
+            start, end = self._string_offsets[index], self._string_offsets[index + 1]
+            value = self._decoded[index] = str(self._strings[start:end], "utf-8")
+        return value
+
+    def _string_id(self, value: str):
+        if self._ids is None:
+            self._ids = {self.string(i): i for i in range(len(self._string_offsets) - 1)}
+        return self._ids.get(value)
+
+    def _term(self, i: int) -> bytes:
+        return bytes(self._terms[self._term_offsets[i]:self._term_offsets[i + 1]])
+
+    def term_id(self, term: str):
+        """Position of `term` in the sorted vocabulary, or None."""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.term_count and self._term(lo) == key else None
+
+    def postings(self, term: str):
+        """(doc ids, term frequencies) of `term`, as zero-copy views; empty if unknown."""
+        t = self.term_id(term)
+        if t is None:
+            return (), ()
+        start, end = self._starts[t], self._starts[t + 1]
+        return self._doc_ids[start:end], self._tfs[start:end]
+
+    def _allowed(self, kb, type, article):
+        """Predicate over doc ids for the filters, or None when there are none."""
+        checks = []
+        if kb is not None:
+            kbs = {self._string_id(k) for k in ([kb] if isinstance(kb, str) else kb)}
+            kb_column = self._docs["kb"]
+            checks.append(lambda d: kb_column[d] in kbs)
+        if type is not None:
+            type_id = self._string_id(type)
+            type_column = self._docs["type"]
+            checks.append(lambda d: type_column[d] == type_id)
+        if article is not None:
+            article_column = self._docs["article"]
+            checks.append(lambda d: article_matches(self.string(article_column[d]), article))
+        if not checks:
+            return None
+        return lambda d: all(check(d) for check in checks)
+
+    def search(self, query: str, k: int = 10, kb=None, type: str = None, article: str = None) -> list:
+        """
+        Top-k entries for `query` by BM25, best first. `kb` (a title or several), `type`
+        (e.g. "Article 12") and `article` (an article number, matching it and its sub-paragraphs)
+        narrow the hits.
+        """
+        allowed = self._allowed(kb, type, article)
+        lengths = self._docs["length"]
+        norm, scale = K1 * (1 - B), K1 * B / self.avg_length
+        scores = {}
+        for term in set(tokenize(query)):
+            doc_ids, tfs = self.postings(term)
+            if not len(doc_ids):
+                continue
+            idf = math.log(1 + (self.doc_count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            for d, tf in zip(doc_ids, tfs):
+                if allowed is not None and not allowed(d):
+                    continue
+                scores[d] = scores.get(d, 0.0) + idf * tf * (K1 + 1) / (tf + norm + scale * lengths[d])
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [self._hit(d, score) for d, score in top]
+
+    def _hit(self, d: int, score: float) -> Hit:
+        docs = self._docs
+        return Hit(score, d, self.string(docs["kb"][d]), self.string(docs["type"][d]),
+                   self.string(docs["article"][d]), self.string(docs["source"][d]), docs["row"][d])
+
+    def entry(self, hit: Hit) -> dict:
+        """The full entry behind a hit, read from its source file."""
+        source = os.path.join(os.path.dirname(self.index_file), hit.source)
+        if source not in self._loaded:
+            self._loaded[source] = list(iter_entries(source))
+        return self._loaded[source][hit.row]
+
+    def close(self):
+        self._starts = self._doc_ids = self._tfs = self._term_offsets = self._string_offsets = None
+        self._docs = self._terms = self._strings = None
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def open_index(index_file: str = INDEX_FILE) -> BM25Index:
+    return BM25Index(index_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    bld = sub.add_parser("build", help="index entry files (default: the outputs ingest_laws.py publishes)")
+    bld.add_argument("files", nargs="*")
+    bld.add_argument("--index", default=INDEX_FILE)
+    qry = sub.add_parser("query", help="top-k BM25 hits for a query")
+    qry.add_argument("query")
+    qry.add_argument("-k", type=int, default=10)
+    qry.add_argument("--kb", nargs="+")
+    qry.add_argument("--type")
+    qry.add_argument("--article")
+    qry.add_argument("--index", default=INDEX_FILE)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.files:
+            files = args.files
+        else:
+            from ingest_laws import published_outputs
+            files = published_outputs()
+        start = time.perf_counter()
+        count = build_index(files, args.index)
+        print(f"✅ Indexed {count} entries from {len(files)} files → {args.index} "
+              f"({os.path.getsize(args.index) / 1024:.1f} KB, {time.perf_counter() - start:.2f}s)")
+    else:
+        with open_index(args.index) as index:
+            start = time.perf_counter()
+            hits = index.search(args.query, k=args.k, kb=args.kb, type=args.type, article=args.article)
+            elapsed = time.perf_counter() - start
+            for hit in hits:
+                text = index.entry(hit)["text"]
+                print(f"{hit.score:7.3f}  {hit.kb} / {hit.type} / {hit.article_number}: "
+                      f"{text[:100]}{'…' if len(text) > 100 else ''}")
+            print(f"{len(hits)} hits in {elapsed * 1000:.3f}ms")
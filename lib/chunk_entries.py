@@ -0,0 +1,168 @@
+"""
+Pack parsed law entries into embedding-ready chunks of at most --budget tokens, so each
+embedding request carries as much law as it can and nothing is truncated.
+
+    python chunk_entries.py laws_json_file/*.json                  # report requests before/after
+    python chunk_entries.py laws_json_file/*.json --budget 256 --overlap 32 \\
+        --out laws_json_file/chunks/all.jsonl
+
+The parsers emit anything from two-word fragments (the min_words floor) to multi-paragraph
+sections, one embedding request each. This stage:
+- splits an entry over the budget on sentence boundaries (a sentence that alone is over
+  the budget is cut between words); with --overlap each part repeats the last sentences
+  of the previous part, up to that many tokens, so no sentence loses its lead-in,
+- merges consecutive siblings (same kb, type and, for us_code entries, parent) greedily
+  while the merged text still fits, which gives the fewest chunks for the entries' order.
+Tokens are estimated as characters / 4, about what nomic-embed-text's WordPiece vocabulary
+averages on English legal text; --chars-per-token adjusts it for another model.
+
+Every chunk keeps the kb, type and article number naming of its entries (article_number, or
+"article number" for EU entries) and lists them under "sources"; a merged chunk's article
+number spans its first and last entry, e.g. "(a)–(c)".
+"""
+import argparse
+import math
+import os
+import time
+
+from law_io import iter_entries, write_entries
+from law_parser import SENTENCE_END_RE, word_count
+
+DEFAULT_BUDGET = 512          # tokens per chunk
+CHARS_PER_TOKEN = 4.0
+JOINER = "\n"
+
+
+def article_key(entry: dict) -> str:
+    return "article number" if "article number" in entry else "article_number"
+
+
+def sibling_key(entry: dict) -> tuple:
+    return entry.get("kb"), entry.get("type"), entry.get("parent")
+
+
+def estimate_tokens(text: str, chars_per_token: float = CHARS_PER_TOKEN) -> int:
+    return math.ceil(len(text) / chars_per_token)
+
+
+def _pieces(text: str, max_chars: int):
+    """Sentences of `text`, with any sentence longer than `max_chars` cut at word boundaries."""
+    for sentence in SENTENCE_END_RE.split(text):
+        if len(sentence) <= max_chars:
+            yield sentence
+            continue
+        current, size = [], 0
+        for word in sentence.split():
+            if current and size + 1 + len(word) > max_chars:
+                yield " ".join(current)
+                current, size = [], 0
+            size += len(word) + (1 if current else 0)
+            current.append(word)
+        if current:
+            yield " ".join(current)
+
+
+def split_text(text: str, budget: int, overlap: int = 0, chars_per_token: float = CHARS_PER_TOKEN) -> list:
+    """Split `text` into parts of at most `budget` tokens, each starting with up to `overlap` tokens of the last."""
+    max_chars = int(budget * chars_per_token)
+    if len(text) <= max_chars:
+        return [text]
+    overlap_chars = int(overlap * chars_per_token)
+    parts, current = [], []
+    for piece in _pieces(text, max_chars):
+        if current and len(" ".join(current)) + 1 + len(piece) > max_chars:
+            parts.append(" ".join(current))
+            carry = []
+            for sentence in reversed(current):
+                if len(" ".join([sentence] + carry)) > overlap_chars:
+                    break
+                carry.insert(0, sentence)
+            current = carry if carry and len(" ".join(carry)) + 1 + len(piece) <= max_chars else []
+        current.append(piece)
+    if current:
+        parts.append(" ".join(current))
+    return parts
+
+
+def _chunk(units: list, chars_per_token: float) -> dict:
+    """One chunk from [(entry, text, part number or None)] of the same sibling group."""
+    first = units[0][0]
+    key = article_key(first)
+    text = JOINER.join(text for _, text, _ in units)
+    sources = []
+    for entry, _, part in units:
+        source = {key: entry.get(key)}
+        if part is not None:
+            source["part"] = part
+        elif "part" in entry:
+            source["part"] = entry["part"]
+        sources.append(source)
+
+    first_article, last_article = units[0][0].get(key), units[-1][0].get(key)
+    chunk = {
+        "kb": first.get("kb"),
+        key: first_article if first_article == last_article else f"{first_article}–{last_article}",
+        "type": first.get("type"),
+        "text": text,
+        "word count" if key == "article number" else "word_count": word_count(text),
+        "tokens": estimate_tokens(text, chars_per_token),
+        "sources": sources,
+    }
+    # us_code lead-in text is shared by siblings; keep it whenever every entry agrees
+    contexts = {entry.get("context") for entry, _, _ in units}
+    if len(contexts) == 1 and None not in contexts:
+        chunk["parent"] = first.get("parent")
+        chunk["context"] = contexts.pop()
+    return chunk
+
+
+def chunk_entries(entries, budget: int = DEFAULT_BUDGET, overlap: int = 0,
+                  chars_per_token: float = CHARS_PER_TOKEN):
+    """Yield chunks of at most `budget` tokens from `entries` (streamed, in order)."""
+    if overlap >= budget:
+        raise ValueError(f"overlap ({overlap}) must be smaller than the budget ({budget})")
+    max_chars = int(budget * chars_per_token)
+    pending, pending_chars, group = [], 0, None
+    for entry in entries:
+        key = sibling_key(entry)
+        parts = split_text(entry.get("text", ""), budget, overlap, chars_per_token)
+        for i, text in enumerate(parts, start=1):
+            needed = len(text) + (len(JOINER) if pending else 0)
+            if pending and (key != group or pending_chars + needed > max_chars):
+                yield _chunk(pending, chars_per_token)
+                pending, pending_chars, needed = [], 0, len(text)
+            pending.append((entry, text, i if len(parts) > 1 else None))
+            pending_chars += needed
+            group = key
+    if pending:
+        yield _chunk(pending, chars_per_token)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="entry files (.json, .jsonl or .lawc)")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="maximum tokens per chunk")
+    parser.add_argument("--overlap", type=int, default=0, help="tokens repeated between the parts of a split entry")
+    parser.add_argument("--chars-per-token", type=float, default=CHARS_PER_TOKEN)
+    parser.add_argument("--out", metavar="FILE", help="write every chunk here (.json, .jsonl or .lawc)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    chunks, before, oversized = [], 0, 0
+    for path in args.files:
+        entries = list(iter_entries(path))
+        file_chunks = list(chunk_entries(entries, args.budget, args.overlap, args.chars_per_token))
+        over = sum(estimate_tokens(e.get("text", ""), args.chars_per_token) > args.budget for e in entries)
+        print(f"{os.path.basename(path):<48} {len(entries):>5} requests → {len(file_chunks):>5}  "
+              f"({over} entries over the budget)")
+        chunks += file_chunks
+        before += len(entries)
+        oversized += over
+
+    largest = max((chunk["tokens"] for chunk in chunks), default=0)
+    print(f"📊 Embedding requests: {before} → {len(chunks)} ({1 - len(chunks) / max(1, before):.0%} fewer), "
+          f"{oversized} oversized entries split, largest chunk ≈{largest} tokens "
+          f"(budget {args.budget}, overlap {args.overlap}) in {time.perf_counter() - start:.2f}s")
+    if args.out:
+        write_entries(args.out, chunks)
+        print(f"✅ Chunks → {args.out}")
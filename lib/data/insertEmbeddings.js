@@ -1,13 +1,31 @@
+import { createReadStream } from "fs";
 import { readFile } from "fs/promises";
 import path from "path";
+import readline from "readline";
 import { generateEmbedding, storeEmbedding } from "../llm.js";
 
-export async function processDocuments() {
-  const filePath = path.join(process.cwd(), "lib/laws_json_file/Utah_Social_Media_Regulation_Act.json");
-  const fileContent = await readFile(filePath, "utf-8");
-  const docs = JSON.parse(fileContent);
+// Yields law entries one at a time. JSON Lines files (.jsonl) are streamed line by line,
+// so a large regulation is never held in memory at once; .json arrays are parsed whole.
+async function* readEntries(filePath) {
+  if (filePath.endsWith(".jsonl")) {
+    const lines = readline.createInterface({
+      input: createReadStream(filePath, "utf-8"),
+      crlfDelay: Infinity
+    });
+    for await (const line of lines) {
+      if (line.trim()) yield JSON.parse(line);
+    }
+    return;
+  }
+  yield* JSON.parse(await readFile(filePath, "utf-8"));
+}
+
+export async function processDocuments(
+  file = "lib/laws_json_file/Utah_Social_Media_Regulation_Act.json"
+) {
+  const filePath = path.join(process.cwd(), file);
 
-  for (const doc of docs) {
+  for await (const doc of readEntries(filePath)) {
     try {
       const embedding = await generateEmbedding(doc.text);
 
@@ -17,6 +35,8 @@ export async function processDocuments() {
         type: doc.type,
         section: doc.section || null,
         word_count: doc["word count"] || null,
+        // How the PDF text was read: "text" (embedded layer), "ocr" or "mixed"
+        source: doc.source || null,
       };
 
       await storeEmbedding({ text: doc.text, embedding, metadata });
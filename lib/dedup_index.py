@@ -0,0 +1,220 @@
+"""
+Near-duplicate clause index (MinHash + LSH) over law entries, run before embedding so
+each distinct clause costs one embedding call and one vector row.
+
+    python dedup_index.py laws_json_file/*.json
+    python dedup_index.py laws_json_file/*.json --threshold 0.9 \\
+        --canonical laws_json_file/canonical.jsonl --duplicates laws_json_file/duplicates.json
+
+Entries from every parser are treated alike: the text is lower-cased and tokenised with
+law_parser's word pattern, cut into overlapping 5-word shingles, and summarised by a
+100-value MinHash signature. The signature is computed with one-permutation hashing (each
+shingle hash is used once, its value modulo 100 choosing the bin), so it costs O(words)
+per entry in plain Python instead of O(words x permutations).
+
+- Exact duplicates (same normalised text) are grouped by hash first and indexed once.
+- LSH splits each signature into 20 bands of 5 rows; entries sharing any band are
+  candidates (a pair with Jaccard 0.8 shares a band with probability > 0.999). Candidates
+  are confirmed with the exact Jaccard similarity of the two shingle sets, kept as compact
+  sorted arrays: a MinHash estimate alone would miss about half the pairs sitting right
+  at the threshold. Only the shingle arrays and one integer per band are kept per entry.
+- Inside a bucket an entry is only compared with one member of each cluster already in
+  that bucket, so shared boilerplate doesn't turn a big bucket into a quadratic loop.
+
+The first entry of each cluster (in input order) is its canonical entry.
+"""
+import argparse
+import hashlib
+from array import array
+import json
+import os
+import time
+import zlib
+
+from law_io import iter_entries, write_entries
+from law_parser import WORD_RE
+
+SHINGLE_WORDS = 5
+BANDS = 20
+ROWS = 5
+NUM_BINS = BANDS * ROWS
+DEFAULT_THRESHOLD = 0.8
+
+_MASK64 = (1 << 64) - 1
+_EMPTY = _MASK64
+
+
+def _mix(x: int) -> int:
+    # splitmix64 finaliser: spreads the polynomial shingle hash over all 64 bits
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & _MASK64
+    return x ^ (x >> 31)
+
+
+def normalize(text: str) -> list:
+    return WORD_RE.findall(text.lower())
+
+
+def shingle_hashes(words: list, k: int = SHINGLE_WORDS) -> set:
+    """64-bit hashes of every k-word window (the whole text if it is shorter than k words)."""
+    word_hashes = [zlib.crc32(w.encode("utf-8")) for w in words]
+    if len(word_hashes) < k:
+        k = max(1, len(word_hashes))
+    out = set()
+    for i in range(len(word_hashes) - k + 1):
+        h = 0
+        for wh in word_hashes[i:i + k]:
+            h = (h * 0x100000001B3 + wh + 1) & _MASK64
+        out.add(_mix(h))
+    return out
+
+
+def signature(hashes) -> tuple:
+    """One-permutation MinHash: the minimum hash falling in each of NUM_BINS bins."""
+    bins = [_EMPTY] * NUM_BINS
+    for h in hashes:
+        b = h % NUM_BINS
+        if h < bins[b]:
+            bins[b] = h
+    # Densify: an empty bin borrows the next non-empty bin's value (rotating), which keeps
+    # the collision probability equal to the Jaccard similarity for short texts
+    if _EMPTY in bins and any(v != _EMPTY for v in bins):
+        for b in range(NUM_BINS):
+            if bins[b] == _EMPTY:
+                step = 1
+                while bins[(b + step) % NUM_BINS] == _EMPTY:
+                    step += 1
+                bins[b] = _mix(bins[(b + step) % NUM_BINS] + step)
+    return tuple(bins)
+
+
+class DedupIndex:
+    """Incremental LSH index; add() entries, then read clusters() or canonical()."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.count = 0
+        self._parent = []                 # union-find over entry ids
+        self._exact = {}                  # digest of normalised text -> first id
+        self._shingles = {}               # id -> sorted array of its shingle hashes
+        self._buckets = [dict() for _ in range(BANDS)]   # band hash -> id, or list of ids
+
+    def _find(self, i: int) -> int:
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def _union(self, a: int, b: int):
+        a, b = self._find(a), self._find(b)
+        if a != b:
+            # The lower id (earlier entry) stays the root, so it is the canonical entry
+            self._parent[max(a, b)] = min(a, b)
+
+    def add(self, text: str) -> int:
+        """Index one entry's text and return its id (its position in insertion order)."""
+        entry_id = self.count
+        self.count += 1
+        self._parent.append(entry_id)
+
+        words = normalize(text)
+        digest = hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=16).digest()
+        first = self._exact.get(digest)
+        if first is not None:
+            self._union(first, entry_id)
+            return entry_id
+        self._exact[digest] = entry_id
+
+        hashes = shingle_hashes(words)
+        sig = signature(hashes)
+        self._shingles[entry_id] = array("Q", sorted(hashes))
+        for band, buckets in enumerate(self._buckets):
+            key = hash(sig[band * ROWS:(band + 1) * ROWS])
+            members = buckets.get(key)
+            if members is None:
+                buckets[key] = entry_id          # most buckets never get a second member
+                continue
+            if isinstance(members, int):
+                members = buckets[key] = [members]
+            compared = set()
+            for other in members:
+                root = self._find(other)
+                if root in compared or root == self._find(entry_id):
+                    continue
+                compared.add(root)
+                if self._jaccard(hashes, other) >= self.threshold:
+                    self._union(other, entry_id)
+            members.append(entry_id)
+        return entry_id
+
+    def _jaccard(self, hashes: set, other: int) -> float:
+        theirs = self._shingles[other]
+        shared = len(hashes.intersection(theirs))
+        return shared / (len(hashes) + len(theirs) - shared)
+
+    def clusters(self) -> list:
+        """Lists of ids with more than one member, each in insertion order."""
+        groups = {}
+        for i in range(self.count):
+            groups.setdefault(self._find(i), []).append(i)
+        return [ids for ids in groups.values() if len(ids) > 1]
+
+    def canonical(self, entry_id: int) -> int:
+        return self._find(entry_id)
+
+
+def entry_label(entry: dict) -> str:
+    """Human-readable id of an entry: kb / type / article number."""
+    article = entry.get("article_number", entry.get("article number"))
+    return f"{entry.get('kb')} / {entry.get('type')} / {article}"
+
+
+def dedupe(entries, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Returns (canonical entries in input order, duplicate map). The duplicate map lists
+    every cluster as {"canonical": member, "duplicates": [members]}, each member being
+    {"index": position in `entries`, "entry": kb / type / article number}.
+    """
+    entries = list(entries)
+    index = DedupIndex(threshold)
+    for entry in entries:
+        index.add(entry.get("text", ""))
+    canonical = [entry for i, entry in enumerate(entries) if index.canonical(i) == i]
+
+    def member(i):
+        return {"index": i, "entry": entry_label(entries[i])}
+
+    duplicate_map = [{"canonical": member(ids[0]), "duplicates": [member(i) for i in ids[1:]]}
+                     for ids in index.clusters()]
+    return canonical, duplicate_map
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="entry files (.json, .jsonl or .lawc)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Jaccard similarity of the 5-word shingles at which two clauses count as duplicates")
+    parser.add_argument("--canonical", metavar="FILE", help="write the canonical entries here")
+    parser.add_argument("--duplicates", metavar="FILE", help="write the duplicate map (JSON) here")
+    args = parser.parse_args()
+
+    entries = [entry for path in args.files for entry in iter_entries(path)]
+    start = time.perf_counter()
+    canonical, duplicate_map = dedupe(entries, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    for cluster in duplicate_map[:20]:
+        duplicates = [d["entry"] for d in cluster["duplicates"]]
+        print(f"🔁 {cluster['canonical']['entry']}  ←  {', '.join(duplicates[:3])}"
+              f"{' …' if len(cluster['duplicates']) > 3 else ''}")
+    print(f"{len(entries)} entries → {len(canonical)} canonical, {len(duplicate_map)} duplicate clusters "
+          f"({len(entries) - len(canonical)} embedding calls saved) in {elapsed:.2f}s")
+
+    if args.canonical:
+        write_entries(args.canonical, canonical)
+        print(f"✅ Canonical entries → {args.canonical}")
+    if args.duplicates:
+        os.makedirs(os.path.dirname(args.duplicates) or ".", exist_ok=True)
+        with open(args.duplicates, "w", encoding="utf-8") as f:
+            json.dump(duplicate_map, f, indent=4, ensure_ascii=False)
+        print(f"✅ Duplicate map → {args.duplicates}")
@@ -0,0 +1,142 @@
+"""
+What changed between two builds of the same law: which entries are new, changed or removed.
+
+Entries are matched on (type, article number, occurrence), e.g. ("Article 12", "1", 0), so
+an amended paragraph shows up as "changed" rather than as a removal plus an addition. The
+delta is written to laws_json_file/delta/<name>.json next to the full entries file, so the
+embedding step can re-embed just those entries instead of the whole document:
+
+    {"new": 1, "changed": 2, "removed": 0, "unchanged": 40,
+     "entries": [{...entry, "status": "changed"}, ..., {...old entry, "status": "removed"}]}
+
+The delta is worked out while the new build streams to disk, without holding either build
+in memory: the previous build is read once through iter_entries into a {key: hash} map, each
+new entry is hashed as it passes on to the writer, and only the delta entries are spooled.
+The removed entries are read back from the previous build at the end, through a hard link
+that keeps it readable after the new file has replaced it.
+
+    with EntryDelta(json_file) as delta:
+        count = write_entries(json_file, delta.track(entries))
+        counts = delta.write()
+"""
+import json
+import os
+import shutil
+
+from law_io import iter_entries
+
+STATUSES = ("new", "changed", "removed", "unchanged")
+
+
+def entry_key(entry: dict) -> tuple:
+    # California/US entries use "article_number", EU entries "article number"
+    return entry.get("type"), entry.get("article_number", entry.get("article number"))
+
+
+def entry_hash(entry: dict) -> int:
+    # Both builds are hashed in the same process, so Python's own hash will do: equal for
+    # equal entries (in any key order, like dict ==) and far cheaper than serialising them
+    try:
+        return hash(tuple(sorted(entry.items())))
+    except TypeError:       # a list or dict value
+        return hash(json.dumps(entry, sort_keys=True, ensure_ascii=False))
+
+
+def _keyed(entries):
+    """Yield ((type, article number, occurrence), entry), occurrence counting repeats of a marker."""
+    seen = {}
+    for entry in entries:
+        key = entry_key(entry)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        yield key + (occurrence,), entry
+
+
+def delta_path(json_file: str) -> str:
+    # Kept in a subfolder so laws_json_file/*.json stays a list of law entry files
+    return os.path.join(os.path.dirname(json_file), "delta", os.path.basename(json_file))
+
+
+def _dump(entry: dict, indent: str) -> str:
+    return json.dumps(entry, indent=4, ensure_ascii=False).replace("\n", "\n" + indent)
+
+
+class EntryDelta:
+    """
+    The delta between `previous_file` (default: the build of `json_file` about to be
+    replaced) and the entries passed through track(), written by write().
+    """
+
+    def __init__(self, json_file: str, previous_file: str = None):
+        self.json_file = json_file
+        self.previous_file = previous_file or json_file
+        self.counts = {status: 0 for status in STATUSES}
+        self._previous = {}       # key -> hash of every previous entry not matched yet
+        self._snapshot = None
+        self._spool = None
+
+    def __enter__(self):
+        path = delta_path(self.json_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            if os.path.exists(self.previous_file):
+                if os.path.abspath(self.previous_file) == os.path.abspath(self.json_file):
+                    # A second name for the build being replaced, so write() can still read it
+                    root, ext = os.path.splitext(path)
+                    self._snapshot = f"{root}.{os.getpid()}.previous{ext}"
+                    try:
+                        os.link(self.previous_file, self._snapshot)
+                    except OSError:
+                        shutil.copyfile(self.previous_file, self._snapshot)
+                self._previous = {key: entry_hash(entry) for key, entry in _keyed(iter_entries(self._source()))}
+            self._spool = open(f"{path}.{os.getpid()}.spool", "w+", encoding="utf-8")
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def _source(self) -> str:
+        return self._snapshot or self.previous_file
+
+    def track(self, entries):
+        """Pass entries through unchanged, spooling each one that is new or changed."""
+        for key, entry in _keyed(entries):
+            old = self._previous.pop(key, None)
+            if old is None:
+                status = "new"
+            else:
+                status = "unchanged" if old == entry_hash(entry) else "changed"
+            self.counts[status] += 1
+            if status != "unchanged":
+                self._spool.write(json.dumps(dict(entry, status=status), ensure_ascii=False) + "\n")
+            yield entry
+
+    def write(self) -> dict:
+        """Write laws_json_file/delta/<name>; returns how many entries had each status."""
+        if self._previous:
+            for key, entry in _keyed(iter_entries(self._source())):
+                if key in self._previous:
+                    self.counts["removed"] += 1
+                    self._spool.write(json.dumps(dict(entry, status="removed"), ensure_ascii=False) + "\n")
+
+        # Same layout as json.dump(dict(counts, entries=[...]), indent=4), one entry at a time
+        path = delta_path(self.json_file)
+        tmp = path + ".tmp"
+        self._spool.seek(0)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.counts, indent=4)[:-2] + ',\n    "entries": [')
+            first = True
+            for line in self._spool:
+                f.write(("\n        " if first else ",\n        ") + _dump(json.loads(line), "        "))
+                first = False
+            f.write("]\n}" if first else "\n    ]\n}")
+        os.replace(tmp, path)
+        return dict(self.counts)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._spool is not None:
+            self._spool.close()
+            os.remove(self._spool.name)
+        if self._snapshot and os.path.exists(self._snapshot):
+            os.remove(self._snapshot)
+        return False
@@ -0,0 +1,279 @@
+"""
+Long-running ingestion service: watch laws_pdf_file/ and publish laws_json_file/ as
+regulations are added or changed, without anyone editing a script.
+
+    python ingest_daemon.py                    # poll every 2s, one job per core
+    python ingest_daemon.py --jobs 2 --interval 10 --queue-size 8
+
+A polling watcher lists laws_pdf_file/ and queues a PDF/TXT once its size and mtime have
+stayed put for one interval (so half-copied files are left alone). Files listed in
+laws_manifest.json use their manifest entry; any other file gets kb = file name, the
+"california" profile for PDFs / "us_code" for text, and laws_json_file/<name>.json.
+
+Queued documents are rebuilt by ingest_laws.build_document in a process pool of --jobs
+workers, so OCR and parsing never run on the event loop. The queue holds at most
+--queue-size documents; when it is full the watcher waits, which is the backpressure.
+Outputs are written atomically (law_io.EntryWriter) and recorded in the same state file
+as ingest_laws.py, so unchanged documents are skipped after a restart as well.
+
+Queue depth, in-flight jobs and enqueue→publish latency are printed each interval and
+written to laws_json_file/.ingest_metrics.json. The BM25 keyword index (bm25_index.py) is
+rebuilt after every publish. Ctrl-C / SIGTERM stops watching, lets running jobs finish and
+exits.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ingest_laws import LIB_DIR, MANIFEST, build_document, fingerprint, is_stale, load_manifest, load_state, \
+    record_state, state_key, update_search_index
+
+WATCH_DIR = os.path.join(LIB_DIR, "laws_pdf_file")
+OUTPUT_DIR = os.path.join(LIB_DIR, "laws_json_file")
+METRICS_FILE = os.path.join(OUTPUT_DIR, ".ingest_metrics.json")
+SOURCE_EXTENSIONS = (".pdf", ".txt")
+DEFAULT_PROFILES = {".pdf": "california", ".txt": "us_code"}
+
+
+def default_doc(path: str) -> dict:
+    """Manifest-style entry for a file that isn't listed in laws_manifest.json."""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return {"source": path, "output": os.path.join(OUTPUT_DIR, stem + ".json"),
+            "kb": stem, "profile": DEFAULT_PROFILES[ext.lower()]}
+
+
+def doc_for(path: str, manifest_path: str = MANIFEST) -> dict:
+    for doc in load_manifest(manifest_path):
+        if os.path.abspath(doc["source"]) == os.path.abspath(path):
+            return doc
+    return default_doc(path)
+
+
+def scan(watch_dir: str = WATCH_DIR) -> dict:
+    """{path: (mtime_ns, size)} of every source document in `watch_dir`."""
+    found = {}
+    with os.scandir(watch_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.lower().endswith(SOURCE_EXTENSIONS) and not entry.name.startswith("."):
+                st = entry.stat()
+                found[entry.path] = (st.st_mtime_ns, st.st_size)
+    return found
+
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Metrics:
+    """Counters and recent enqueue→publish latencies of the running service."""
+
+    def __init__(self, window: int = 500):
+        self.started = time.time()
+        self.enqueued = 0
+        self.published = 0
+        self.skipped = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.latencies = collections.deque(maxlen=window)
+        self.build_times = collections.deque(maxlen=window)
+
+    def snapshot(self, queue_depth: int) -> dict:
+        uptime = time.time() - self.started
+        return {
+            "uptime_s": round(uptime, 1),
+            "queue_depth": queue_depth,
+            "in_flight": self.in_flight,
+            "enqueued": self.enqueued,
+            "published": self.published,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "published_per_min": round(self.published / uptime * 60, 2) if uptime else 0.0,
+            "latency_p50_s": round(_percentile(list(self.latencies), 50), 3),
+            "latency_p95_s": round(_percentile(list(self.latencies), 95), 3),
+            "latency_max_s": round(max(self.latencies, default=0.0), 3),
+            "build_p50_s": round(_percentile(list(self.build_times), 50), 3),
+        }
+
+
+class IngestService:
+    def __init__(self, jobs: int, queue_size: int, interval: float, ocr_workers: int = 1,
+                 watch_dir: str = WATCH_DIR, manifest: str = MANIFEST, metrics_file: str = METRICS_FILE):
+        self.jobs = max(1, jobs)
+        self.interval = interval
+        self.ocr_workers = ocr_workers
+        self.watch_dir = watch_dir
+        self.manifest = manifest
+        self.metrics_file = metrics_file
+        self.queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self.metrics = Metrics()
+        self.pending = set()       # queued or being built; a path is never in the queue twice
+        self.dirty = set()         # changed again while being built; re-queued afterwards
+        self.requeues = set()      # enqueue tasks for dirty paths, referenced until done
+        self.jobs_running = set()  # _process tasks, awaited on shutdown
+        self.stopping = asyncio.Event()
+        self.index_lock = asyncio.Lock()   # one index rebuild at a time
+
+    async def enqueue(self, path: str):
+        if path in self.pending:
+            self.dirty.add(path)
+            return
+        self.pending.add(path)
+        self.metrics.enqueued += 1
+        await self.queue.put((path, time.perf_counter()))     # blocks while the queue is full
+
+    async def watch(self):
+        """Queue files whose (mtime, size) changed and then held still for one interval."""
+        seen, settling = {}, {}
+        while not self.stopping.is_set():
+            current = await asyncio.to_thread(scan, self.watch_dir)
+            for path, signature in current.items():
+                if seen.get(path) == signature:
+                    continue
+                if settling.get(path) == signature:
+                    del settling[path]
+                    seen[path] = signature
+                    await self.enqueue(path)
+                else:
+                    settling[path] = signature
+            for path in set(seen) - set(current):
+                del seen[path]
+            await self._sleep()
+
+    async def worker(self, pool: ProcessPoolExecutor):
+        loop = asyncio.get_running_loop()
+        while True:
+            path, queued_at = await self.queue.get()
+            try:
+                if self.stopping.is_set():
+                    continue
+                # Its own task, so shutdown can wait for it to finish instead of cancelling it
+                job = asyncio.create_task(self._process(loop, pool, path, queued_at))
+                self.jobs_running.add(job)
+                job.add_done_callback(self.jobs_running.discard)
+                await job
+            finally:
+                self.queue.task_done()
+                self.pending.discard(path)
+                if path in self.dirty and not self.stopping.is_set():
+                    # From a separate task, so a full queue can't block the worker that drains it
+                    self.dirty.discard(path)
+                    requeue = asyncio.create_task(self.enqueue(path))
+                    self.requeues.add(requeue)
+                    requeue.add_done_callback(self.requeues.discard)
+
+    async def _process(self, loop, pool, path: str, queued_at: float):
+        try:
+            doc = doc_for(path, self.manifest)
+            fp = await asyncio.to_thread(fingerprint, doc)
+        except (OSError, ValueError) as err:      # deleted mid-flight, or a broken manifest
+            print(f"❌ {os.path.basename(path)}: {err}")
+            self.metrics.failed += 1
+            return
+        # Re-read each time: ingest_laws.py may have built the document meanwhile
+        state = await asyncio.to_thread(load_state)
+        if not is_stale(doc, state, fp):
+            self.metrics.skipped += 1
+            return
+
+        self.metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            count, _ = await loop.run_in_executor(pool, build_document, doc, self.ocr_workers)
+        except Exception as err:
+            print(f"❌ {state_key(doc)}: {err}")
+            self.metrics.failed += 1
+            return
+        finally:
+            self.metrics.in_flight -= 1
+        if not count:
+            print(f"⚠️  {state_key(doc)}: no entries parsed, nothing published")
+            self.metrics.skipped += 1
+            return
+
+        await asyncio.to_thread(record_state, state_key(doc), fp)
+        now = time.perf_counter()
+        self.metrics.published += 1
+        self.metrics.build_times.append(now - start)
+        self.metrics.latencies.append(now - queued_at)
+        print(f"✅ Extracted {count} entries → {state_key(doc)} ({now - queued_at:.1f}s after queueing)")
+        async with self.index_lock:
+            await asyncio.to_thread(update_search_index, self.manifest)
+
+    async def report(self):
+        while not self.stopping.is_set():
+            await self._sleep()
+            snapshot = self.metrics.snapshot(self.queue.qsize())
+            await asyncio.to_thread(self._write_metrics, snapshot)
+            if snapshot["queue_depth"] or snapshot["in_flight"]:
+                print(f"📊 queue={snapshot['queue_depth']} in_flight={snapshot['in_flight']} "
+                      f"published={snapshot['published']} failed={snapshot['failed']} "
+                      f"p50={snapshot['latency_p50_s']}s p95={snapshot['latency_p95_s']}s")
+
+    def _write_metrics(self, snapshot: dict):
+        os.makedirs(os.path.dirname(self.metrics_file), exist_ok=True)
+        tmp = self.metrics_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=4)
+        os.replace(tmp, self.metrics_file)
+
+    async def _sleep(self):
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=self.interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stopping.set)
+            except NotImplementedError:            # Windows: Ctrl-C raises KeyboardInterrupt instead
+                pass
+
+        print(f"👀 Watching {self.watch_dir} with {self.jobs} job(s), queue of {self.queue.maxsize}")
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            workers = [asyncio.create_task(self.worker(pool)) for _ in range(self.jobs)]
+            reporter = asyncio.create_task(self.report())
+            watcher = asyncio.create_task(self.watch())
+
+            await self.stopping.wait()
+            watcher.cancel()
+            for task in list(self.requeues):
+                task.cancel()
+            # Queued-but-unstarted documents are simply picked up again on the next start
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.queue.task_done()
+            # Let running jobs finish, including their fingerprint and index rebuild threads
+            while self.jobs_running:
+                await asyncio.gather(*self.jobs_running, return_exceptions=True)
+            for task in workers + [reporter]:
+                task.cancel()
+            await asyncio.gather(watcher, reporter, *workers, *self.requeues, return_exceptions=True)
+
+        self._write_metrics(self.metrics.snapshot(0))
+        print(f"🛑 Stopped after publishing {self.metrics.published} document(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="documents built in parallel")
+    parser.add_argument("--ocr-workers", type=int, default=1, help="OCR processes per document")
+    parser.add_argument("--queue-size", type=int, default=None, help="max queued documents (default 2 x jobs)")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between directory scans")
+    parser.add_argument("--watch", default=WATCH_DIR, help="folder to watch")
+    parser.add_argument("--manifest", default=MANIFEST)
+    args = parser.parse_args()
+
+    service = IngestService(jobs=args.jobs, queue_size=args.queue_size or 2 * max(1, args.jobs),
+                            interval=args.interval, ocr_workers=args.ocr_workers,
+                            watch_dir=args.watch, manifest=args.manifest)
+    asyncio.run(service.run())
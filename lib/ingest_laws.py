@@ -0,0 +1,254 @@
+"""
+Build laws_json_file/ from the documents listed in laws_manifest.json.
+
+    python ingest_laws.py                      # rebuild whatever is out of date
+    python ingest_laws.py --jobs 4             # documents in parallel
+    python ingest_laws.py --only The_Florida_Senate --force
+    python ingest_laws.py --report run_report.json --profile profiles/
+
+Each manifest entry names a source (PDF or outline .txt), the output (.json, or .jsonl for
+JSON Lines), the kb title, the law_parser profile and optionally min_words, text_layer and
+preprocess (a list of ocr_preprocess steps for scanned pages). An output is only rebuilt
+when its source bytes, the parser version or the entry's options changed since the last
+successful build (recorded in laws_json_file/.ingest_state.json), so adding a law doesn't
+re-OCR the others.
+
+Every run prints per-stage wall/CPU time for each rebuilt document (see pipeline_stats.py);
+--report saves the full run report as JSON and --profile adds cProfile/tracemalloc output.
+
+The last stage rebuilds the BM25 keyword index (bm25_index.py) over the published outputs,
+i.e. the manifest's plus any ingest_daemon.py recorded, when a document was rebuilt or the
+index is missing.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bm25_index import INDEX_FILE, build_index
+from entry_delta import EntryDelta
+from law_io import write_entries
+from law_parser import PARSER_VERSION, iter_document
+from ocr_cache import file_sha256
+from pipeline_stats import RunStats, profiling, recording, stage, timed_iter
+
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = os.path.join(LIB_DIR, "laws_manifest.json")
+STATE_FILE = os.path.join(LIB_DIR, "laws_json_file", ".ingest_state.json")
+
+# Manifest keys that change the output; anything else (comments, etc.) is ignored
+OPTION_KEYS = ("kb", "profile", "min_words", "text_layer", "preprocess")
+
+
+def load_manifest(path: str = MANIFEST) -> list:
+    """Manifest entries with source/output resolved relative to the manifest's folder."""
+    with open(path, "r", encoding="utf-8") as f:
+        docs = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    for doc in docs:
+        doc["source"] = os.path.join(base, doc["source"])
+        doc["output"] = os.path.join(base, doc["output"])
+    return docs
+
+
+def load_state(path: str = STATE_FILE) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(state: dict, path: str = STATE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=4, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def record_state(key: str, fp: dict, path: str = STATE_FILE) -> dict:
+    """
+    Record one built document in the state file and return the whole state.
+    The file is re-read first, so entries written meanwhile by another run (the daemon
+    and ingest_laws.py share it) are kept rather than overwritten.
+    """
+    state = load_state(path)
+    state[key] = fp
+    save_state(state, path)
+    return state
+
+
+def fingerprint(doc: dict) -> dict:
+    """Everything a document's JSON depends on."""
+    options = {key: doc[key] for key in OPTION_KEYS if key in doc}
+    return {
+        "source_sha256": file_sha256(doc["source"]),
+        "parser_version": PARSER_VERSION,
+        "options": hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:16],
+    }
+
+
+def state_key(doc: dict) -> str:
+    return os.path.relpath(doc["output"], LIB_DIR)
+
+
+def is_stale(doc: dict, state: dict, fp: dict) -> bool:
+    return not os.path.exists(doc["output"]) or state.get(state_key(doc)) != fp
+
+
+def read_source(doc: dict, ocr_workers: int = 1):
+    """Full text of a source document, plus per-page sources for PDFs (None for text files)."""
+    if doc["source"].lower().endswith(".pdf"):
+        from ocr_pages import read_pdf_pages, join_pages
+        page_texts, page_sources = read_pdf_pages(doc["source"], workers=ocr_workers,
+                                                  text_layer=doc.get("text_layer", True),
+                                                  preprocess=tuple(doc.get("preprocess", ())))
+        return join_pages(page_texts), page_sources
+    with open(doc["source"], "r", encoding="utf-8") as f:
+        return f.read(), None
+
+
+def build_document(doc: dict, ocr_workers: int = 1, profile_dir: str = None):
+    """
+    Extract, parse and write one manifest entry. Runs in a worker process.
+    The entries that are new/changed/removed since the previous build go to laws_json_file/delta/.
+    Returns (entry count, the document's pipeline_stats record).
+    Any failure is raised as a RuntimeError naming the original exception type.
+    """
+    try:
+        return _build_document(doc, ocr_workers, profile_dir)
+    except Exception as err:
+        # Some library exceptions (e.g. pytesseract's TesseractNotFoundError) can't be
+        # unpickled in the parent, and one of those breaks the whole process pool
+        raise RuntimeError(f"{type(err).__name__}: {err}") from None
+
+
+def _build_document(doc: dict, ocr_workers: int, profile_dir: str):
+    stats = RunStats()
+    with recording(stats), stats.document(doc["kb"]), profiling(stats, doc["kb"], profile_dir):
+        full_text, page_sources = read_source(doc, ocr_workers=ocr_workers)
+        stats.count(chars=len(full_text))
+        if page_sources is not None:
+            stats.count(pages=len(page_sources))
+
+        options = {"min_words": doc["min_words"]} if "min_words" in doc else {}
+        entries = iter_document(doc["profile"], full_text, doc["kb"], **options)
+        if page_sources is not None:
+            from ocr_pages import with_source
+            entries = with_source(entries, page_sources)
+
+        # Entries are streamed to disk as the parser yields them; an output ending in .jsonl
+        # is written as JSON Lines, anything else as the indented JSON array
+        with EntryDelta(doc["output"]) as delta:
+            with stage("write"):
+                count = write_entries(doc["output"], timed_iter("parse", delta.track(entries)),
+                                      allow_empty=False)
+            stats.count(entries=count)
+            # Nothing parsed means nothing published: the previous output, if any, stays as it was
+            if count:
+                delta.write()
+                if page_sources is not None:
+                    from ocr_pages import write_page_report
+                    write_page_report(doc["output"], doc["source"], page_sources)
+    return count, stats.documents[doc["kb"]]
+
+
+def ingest(docs: list, jobs: int = 1, ocr_workers: int = 1, force: bool = False,
+           stats: RunStats = None, profile_dir: str = None):
+    """
+    Rebuild the stale documents, `jobs` at a time.
+    Returns ({output: entry count} for rebuilt documents, [outputs that failed]). A document
+    that parses to no entries is neither: it is reported, left unpublished and retried next run.
+    Per-document stage timings are merged into `stats` when given.
+    """
+    state = load_state()
+    todo = []
+    for doc in docs:
+        fp = fingerprint(doc)
+        if force or is_stale(doc, state, fp):
+            todo.append((doc, fp))
+        else:
+            print(f"⏭️  Up to date: {state_key(doc)}")
+
+    built, failed = {}, []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(build_document, doc, ocr_workers, profile_dir): (doc, fp) for doc, fp in todo}
+        for future in as_completed(futures):
+            doc, fp = futures[future]
+            try:
+                count, record = future.result()
+            except Exception as err:
+                print(f"❌ {state_key(doc)}: {err}")
+                failed.append(doc["output"])
+                continue
+            if not count:
+                print(f"⚠️  {state_key(doc)}: no entries parsed, nothing published")
+                continue
+            # Record each success as it lands, so a crash later doesn't redo finished documents
+            record_state(state_key(doc), fp)
+            built[doc["output"]] = count
+            if stats is not None:
+                stats.merge(doc["kb"], record)
+            print(f"✅ Extracted {count} entries → {state_key(doc)}")
+
+    print(f"Rebuilt {len(built)}/{len(docs)} documents in {time.perf_counter() - start:.1f}s")
+    return built, failed
+
+
+def published_outputs(manifest: str = MANIFEST) -> list:
+    """
+    Entry files the pipeline publishes: every manifest output plus every output recorded in
+    the state file (ingest_daemon.py's unlisted documents), if it exists. Other files in
+    laws_json_file/ (.lawc copies, dedup_index.py reports, ...) are not law outputs.
+    """
+    outputs = [doc["output"] for doc in load_manifest(manifest)]
+    outputs += [os.path.join(LIB_DIR, key) for key in sorted(load_state())]
+    seen, published = set(), []
+    for path in outputs:
+        path = os.path.normpath(path)
+        if path not in seen and os.path.exists(path):
+            seen.add(path)
+            published.append(path)
+    return published
+
+
+def update_search_index(manifest: str = MANIFEST, index_file: str = INDEX_FILE) -> int:
+    """Rebuild the BM25 index over the published outputs. Returns the entry count."""
+    start = time.perf_counter()
+    files = published_outputs(manifest)
+    count = build_index(files, index_file)
+    print(f"🔎 Indexed {count} entries from {len(files)} files → {os.path.relpath(index_file, LIB_DIR)} "
+          f"in {time.perf_counter() - start:.2f}s")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", default=MANIFEST)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="documents processed in parallel")
+    parser.add_argument("--ocr-workers", type=int, default=1, help="OCR processes per document")
+    parser.add_argument("--force", action="store_true", help="rebuild even if nothing changed")
+    parser.add_argument("--only", nargs="+", metavar="KB", help="restrict to these kb titles")
+    parser.add_argument("--report", metavar="FILE", help="write the per-stage run report (JSON) here")
+    parser.add_argument("--profile", metavar="DIR", help="cProfile each document into DIR and record tracemalloc peaks")
+    args = parser.parse_args()
+
+    docs = load_manifest(args.manifest)
+    if args.only:
+        docs = [doc for doc in docs if doc["kb"] in args.only]
+    stats = RunStats()
+    built, failed = ingest(docs, jobs=args.jobs, ocr_workers=args.ocr_workers, force=args.force,
+                       stats=stats, profile_dir=args.profile)
+    if built or not os.path.exists(INDEX_FILE):
+        update_search_index(args.manifest)
+    if stats.documents:
+        print(stats.summary())
+    if args.report:
+        stats.write(args.report)
+        print(f"📊 Run report → {args.report}")
+    if failed:
+        raise SystemExit(1)
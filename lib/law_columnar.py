@@ -0,0 +1,417 @@
+"""
+Compact columnar file for law entries (.lawc), read through a memory map without parsing.
+
+    python law_columnar.py convert laws_json_file/*.json           # → laws_json_file/*.lawc
+    python law_columnar.py convert laws_json_file/EU_Digital_Service_Act.lawc -o eu.json
+    python law_columnar.py verify laws_json_file/*.json             # JSON → .lawc → JSON round trip
+    python law_columnar.py bench laws_json_file/*.json              # load time and memory vs JSON
+
+Instead of one JSON object per entry repeating "kb", "type", ... the file stores:
+- a string table: every distinct kb / type / article number / parent / context string once,
+- one little-endian column per field: a string-table index (u32) or an integer (i64),
+- a shape column: which fields each entry has, in their original order, so entries from
+  every parser (article_number vs "article number", optional parent/part) round-trip exactly,
+- every entry's text in one contiguous UTF-8 blob, plus u64 offsets into it.
+
+Layout: b"LAWC" + u32 version + u32 header length + JSON header (count, fields, shapes,
+section offsets), then the 8-byte-aligned sections. `open_entries` maps the file and casts
+the sections to memoryviews, so opening costs the same whatever the corpus size; entry
+views decode a field only when it is read, and `text_bytes()` is a zero-copy slice.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections.abc import Mapping
+
+MAGIC = b"LAWC"
+VERSION = 1
+TEXT_FIELD = "text"                       # stored in the blob rather than the string table
+KINDS = {"s": "I", "i": "q", "j": "I"}    # string id, integer, JSON-encoded other value
+_LITTLE = sys.byteorder == "little"
+
+
+def _le(values: array) -> bytes:
+    if not _LITTLE:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _kind(value) -> str:
+    if isinstance(value, str):
+        return "s"
+    if isinstance(value, int) and not isinstance(value, bool):
+        return "i"
+    return "j"
+
+
+class ColumnarWriter:
+    """Context manager with the same write()/count interface as law_io.EntryWriter."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._strings = {}
+        self._fields = {}          # name -> [kind, array of values]
+        self._shapes = {}          # tuple of field names -> shape id
+        self._shape_ids = array("I")
+        self._offsets = array("Q", [0])
+        self._blob = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Text goes straight to a temporary file, so only the small columns stay in memory
+        self._blob = tempfile.TemporaryFile(dir=os.path.dirname(self.path) or ".")
+        return self
+
+    def _intern(self, value: str) -> int:
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+        return index
+
+    def _encode(self, kind: str, value) -> int:
+        if kind == "s":
+            return self._intern(value)
+        if kind == "j":
+            return self._intern(json.dumps(value, ensure_ascii=False))
+        return value
+
+    def _column(self, name: str, value):
+        """The column for `name`, widened to JSON-encoded values if `value` doesn't fit it."""
+        kind = _kind(value)
+        if name not in self._fields:
+            self._fields[name] = [kind, array(KINDS[kind], [0]) * self.count]
+        column = self._fields[name]
+        if column[0] != kind and column[0] != "j":
+            strings = list(self._strings)
+            old = [strings[v] if column[0] == "s" else v for v in column[1]]
+            column[:] = ["j", array("I", (self._intern(json.dumps(v, ensure_ascii=False)) for v in old))]
+        return column
+
+    def write(self, entry: dict):
+        if not isinstance(entry.get(TEXT_FIELD, ""), str):
+            raise ValueError(f"entry {self.count}: '{TEXT_FIELD}' must be a string")
+        shape = tuple(entry)
+        if shape not in self._shapes:
+            self._shapes[shape] = len(self._shapes)
+        self._shape_ids.append(self._shapes[shape])
+
+        for name, value in entry.items():
+            if name == TEXT_FIELD:
+                data = value.encode("utf-8")
+                self._blob.write(data)
+                self._offsets.append(self._offsets[-1] + len(data))
+                continue
+            kind, values = self._column(name, value)
+            values.append(self._encode(kind, value))
+        if TEXT_FIELD not in entry:
+            self._offsets.append(self._offsets[-1])
+        self.count += 1
+        # Fields this entry doesn't have still get a slot, so every column stays row-aligned
+        for name, (kind, values) in self._fields.items():
+            if len(values) < self.count:
+                values.append(0)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._publish()
+        finally:
+            self._blob.close()
+        return False
+
+    def _publish(self):
+        strings = [s.encode("utf-8") for s in self._strings]
+        string_offsets = array("Q", [0])
+        for data in strings:
+            string_offsets.append(string_offsets[-1] + len(data))
+
+        names = list(self._fields)
+        sections = [("shape_ids", _le(self._shape_ids)), ("string_offsets", _le(string_offsets)),
+                    ("strings", b"".join(strings))]
+        sections += [(f"field:{name}", _le(self._fields[name][1])) for name in names]
+        sections.append(("text_offsets", _le(self._offsets)))
+
+        header = {
+            "count": self.count,
+            "fields": [[name, self._fields[name][0]] for name in names],
+            "shapes": [list(shape) for shape in self._shapes],
+            "sections": {},
+        }
+        # Section offsets depend on the header's own length, so lay out until it's stable
+        header_len = 0
+        while True:
+            position = _align(12 + header_len)
+            for name, data in sections:
+                header["sections"][name] = [position, len(data)]
+                position = _align(position + len(data))
+            header["sections"]["text"] = [position, self._offsets[-1]]
+            encoded = json.dumps(header).encode("utf-8")
+            if len(encoded) == header_len:
+                break
+            header_len = len(encoded)
+
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(MAGIC + struct.pack("<II", VERSION, header_len) + encoded)
+                for name, data in sections + [("text", None)]:
+                    f.write(b"\0" * (header["sections"][name][0] - f.tell()))
+                    if data is None:
+                        self._blob.seek(0)
+                        while True:
+                            block = self._blob.read(1 << 20)
+                            if not block:
+                                break
+                            f.write(block)
+                    else:
+                        f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def _align(position: int) -> int:
+    return (position + 7) & ~7
+
+
+class ColumnarFile:
+    """A memory-mapped .lawc file; index it or iterate it for lazy EntryView objects."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if bytes(self._view[:4]) != MAGIC:
+            raise ValueError(f"{path} is not a .lawc file")
+        version, header_len = struct.unpack_from("<II", self._view, 4)
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported .lawc version {version}")
+        header = json.loads(bytes(self._view[12:12 + header_len]))
+
+        self.count = header["count"]
+        self._sections = header["sections"]
+        self.shapes = [tuple(shape) for shape in header["shapes"]]
+        self.kinds = dict((name, kind) for name, kind in header["fields"])
+        self.shape_ids = self._column("shape_ids", "I")
+        self._string_offsets = self._column("string_offsets", "Q")
+        self._strings = self._bytes("strings")
+        self.columns = {name: self._column(f"field:{name}", KINDS[kind]) for name, kind in header["fields"]}
+        self._text_offsets = self._column("text_offsets", "Q")
+        self._text = self._bytes("text")
+        self._decoded = {}          # string-table cache: each distinct string is decoded once
+
+    def _bytes(self, section: str) -> memoryview:
+        start, length = self._sections[section]
+        return self._view[start:start + length]
+
+    def _column(self, section: str, typecode: str):
+        data = self._bytes(section)
+        if _LITTLE:
+            return data.cast(typecode)
+        values = array(typecode, data)      # big-endian hosts pay one copy of the small columns
+        values.byteswap()
+        return values
+
+    def string(self, index: int) -> str:
+        value = self._decoded.get(index)
+        if value is None:
+            start, end = self._string_offsets[index], self._string_offsets[index + 1]
+            value = self._decoded[index] = str(self._strings[start:end], "utf-8")
+        return value
+
+    def value(self, row: int, name: str):
+        if name == TEXT_FIELD:
+            return str(self.text_bytes(row), "utf-8")
+        kind, raw = self.kinds[name], self.columns[name][row]
+        if kind == "s":
+            return self.string(raw)
+        if kind == "j":
+            return json.loads(self.string(raw))
+        return raw
+
+    def text_bytes(self, row: int) -> memoryview:
+        """Zero-copy UTF-8 bytes of entry `row`'s text."""
+        return self._text[self._text_offsets[row]:self._text_offsets[row + 1]]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, row: int):
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        return EntryView(self, row)
+
+    def __iter__(self):
+        for row in range(self.count):
+            yield EntryView(self, row)
+
+    def close(self):
+        # Views into the map must be released before it can be closed
+        for name in list(self.columns):
+            if isinstance(self.columns[name], memoryview):
+                self.columns[name].release()
+        for column in (self.shape_ids, self._string_offsets, self._text_offsets):
+            if isinstance(column, memoryview):
+                column.release()
+        self._strings.release()
+        self._text.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class EntryView(Mapping):
+    """Read-only entry backed by the map; `dict(view)` equals the entry that was written."""
+
+    __slots__ = ("_file", "_row")
+
+    def __init__(self, file: ColumnarFile, row: int):
+        self._file = file
+        self._row = row
+
+    def __getitem__(self, name):
+        if name not in self.keys():
+            raise KeyError(name)
+        return self._file.value(self._row, name)
+
+    def keys(self):
+        return self._file.shapes[self._file.shape_ids[self._row]]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def text_bytes(self) -> memoryview:
+        return self._file.text_bytes(self._row)
+
+    def __repr__(self):
+        return f"EntryView({dict(self)!r})"
+
+
+def open_entries(path: str) -> ColumnarFile:
+    return ColumnarFile(path)
+
+
+def write_columnar(path: str, entries) -> int:
+    with ColumnarWriter(path) as writer:
+        for entry in entries:
+            writer.write(entry)
+    return writer.count
+
+
+def convert(source: str, target: str) -> int:
+    """.json/.jsonl → .lawc or .lawc → .json/.jsonl, decided by the extensions."""
+    from law_io import iter_entries, write_entries
+    if target.endswith(".lawc"):
+        return write_columnar(target, iter_entries(source))
+    with open_entries(source) as lawc:
+        return write_entries(target, (dict(entry) for entry in lawc))
+
+
+def verify(json_file: str) -> bool:
+    """True if JSON → .lawc → JSON reproduces the file byte for byte."""
+    with tempfile.TemporaryDirectory() as tmp:
+        lawc = os.path.join(tmp, "entries.lawc")
+        back = os.path.join(tmp, os.path.basename(json_file))
+        convert(json_file, lawc)
+        convert(lawc, back)
+        with open(json_file, "rb") as a, open(back, "rb") as b:
+            return a.read() == b.read()
+
+
+def _bench(json_files: list):
+    lawc_files = []
+    tmp = tempfile.mkdtemp()
+    for json_file in json_files:
+        lawc = os.path.join(tmp, os.path.splitext(os.path.basename(json_file))[0] + ".lawc")
+        convert(json_file, lawc)
+        lawc_files.append(lawc)
+
+    def measure(load):
+        tracemalloc.start()
+        start = time.perf_counter()
+        loaded = load()
+        elapsed = time.perf_counter() - start
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return loaded, elapsed, current
+
+    def load_json():
+        out = []
+        for path in json_files:
+            with open(path, "r", encoding="utf-8") as f:
+                out.append(json.load(f))
+        return out
+
+    docs, json_s, json_mem = measure(load_json)
+    files, lawc_s, lawc_mem = measure(lambda: [open_entries(p) for p in lawc_files])
+    entries = sum(len(d) for d in docs)
+    json_bytes = sum(os.path.getsize(p) for p in json_files)
+    lawc_bytes = sum(os.path.getsize(p) for p in lawc_files)
+    print(f"{len(json_files)} files, {entries} entries")
+    print(f"JSON   {json_bytes / 1024:9.1f} KB on disk  load {json_s * 1000:8.2f}ms  {json_mem / 1024:9.1f} KB heap")
+    print(f".lawc  {lawc_bytes / 1024:9.1f} KB on disk  open {lawc_s * 1000:8.2f}ms  {lawc_mem / 1024:9.1f} KB heap")
+
+    start = time.perf_counter()
+    same = all(dict(view) == entry for f, d in zip(files, docs) for view, entry in zip(f, d))
+    print(f"read every field of every entry: {(time.perf_counter() - start) * 1000:.2f}ms  "
+          f"{'identical' if same else 'MISMATCH'}")
+    for f in files:
+        f.close()
+    for path in lawc_files:
+        os.remove(path)
+    os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    conv = sub.add_parser("convert", help="JSON ↔ .lawc; the target defaults to the other format next to the source")
+    conv.add_argument("files", nargs="+")
+    conv.add_argument("-o", "--output", help="target path (only with a single input)")
+    ver = sub.add_parser("verify", help="check that JSON → .lawc → JSON is byte-identical")
+    ver.add_argument("files", nargs="+")
+    ben = sub.add_parser("bench", help="compare load time and memory with json.load")
+    ben.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        if args.output and len(args.files) > 1:
+            parser.error("-o only works with a single input file")
+        for source in args.files:
+            stem, ext = os.path.splitext(source)
+            target = args.output or (stem + (".json" if ext == ".lawc" else ".lawc"))
+            count = convert(source, target)
+            print(f"✅ {count} entries: {source} → {target} "
+                  f"({os.path.getsize(source) / 1024:.1f} KB → {os.path.getsize(target) / 1024:.1f} KB)")
+    elif args.command == "verify":
+        failed = [f for f in args.files if not verify(f)]
+        for json_file in args.files:
+            print(f"{'❌' if json_file in failed else '✅'} {json_file}")
+        if failed:
+            raise SystemExit(1)
+    else:
+        _bench(args.files)
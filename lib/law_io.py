@@ -0,0 +1,124 @@
+"""
+Streaming writer and reader for law entry files.
+
+- `.jsonl`: one compact JSON object per line (JSON Lines). Each entry is written the moment
+  the parser yields it, and readers can start consuming before the file is finished.
+- `.json`: the original `json.dump(entries, indent=4)` array, streamed entry by entry but
+  byte-identical to dumping the whole list.
+- `.lawc`: the compact columnar format of law_columnar.py, memory-mapped when read.
+
+Either way the file is written to a temporary path and renamed into place on success, so
+a reader never sees a half-written file and a failed run leaves the old file untouched.
+"""
+import itertools
+import json
+import os
+
+
+class EntryWriter:
+    """Context manager that appends entries to `path` and atomically publishes it on exit."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.jsonl = path.endswith(".jsonl")
+        self.count = 0
+        self._tmp = f"{path}.{os.getpid()}.tmp"
+        self._f = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._f = open(self._tmp, "w", encoding="utf-8")
+        return self
+
+    def write(self, entry: dict):
+        if self.jsonl:
+            self._f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        else:
+            # Same layout json.dump(list, indent=4) produces, one element at a time
+            body = json.dumps(entry, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+            self._f.write(("[\n    " if self.count == 0 else ",\n    ") + body)
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                if not self.jsonl:
+                    self._f.write("\n]" if self.count else "[]")
+                self._f.flush()
+                os.fsync(self._f.fileno())
+            self._f.close()
+            if exc_type is None:
+                os.replace(self._tmp, self.path)
+        finally:
+            if os.path.exists(self._tmp):
+                os.remove(self._tmp)
+        return False
+
+
+def write_entries(path: str, entries, allow_empty: bool = True) -> int:
+    """
+    Stream an iterable of entries to `path` (.jsonl, .json or .lawc). Returns how many were written.
+    With allow_empty=False an empty iterable publishes nothing: `path` keeps its previous
+    contents (or stays absent) and 0 is returned, so a parse that found no entries never
+    replaces a law with an empty list.
+    """
+    if not allow_empty:
+        entries = iter(entries)
+        first = next(entries, None)
+        if first is None:
+            return 0
+        entries = itertools.chain([first], entries)
+    if path.endswith(".lawc"):
+        from law_columnar import write_columnar
+        return write_columnar(path, entries)
+    with EntryWriter(path) as writer:
+        for entry in entries:
+            writer.write(entry)
+    return writer.count
+
+
+def iter_entries(path: str):
+    """Yield the entries of a .jsonl file line by line, a .lawc file row by row, or a .json array object by object."""
+    if path.endswith(".lawc"):
+        from law_columnar import open_entries
+        with open_entries(path) as entries:
+            for entry in entries:
+                yield dict(entry)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def _iter_json_array(f, chunk_size: int = 1 << 16):
+    """Decode a JSON array of objects one element at a time, reading `f` in chunks."""
+    decoder = json.JSONDecoder()
+    buf, pos, opened = "", 0, False
+    while True:
+        while pos < len(buf) and (buf[pos].isspace() or (opened and buf[pos] == ",")):
+            pos += 1
+        if pos < len(buf):
+            if not opened:
+                if buf[pos] != "[":
+                    raise json.JSONDecodeError("Expecting '['", buf, pos)
+                opened, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                entry, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                pass          # the object runs past the end of the buffer: read on
+            else:
+                yield entry
+                continue
+        chunk = f.read(chunk_size)
+        if not chunk:
+            if pos < len(buf):
+                decoder.raw_decode(buf, pos)      # raises the real error
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        buf, pos = buf[pos:] + chunk, 0
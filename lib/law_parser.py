@@ -0,0 +1,461 @@
+"""
+Shared law-text parser for the California, EU and US Reporting scripts.
+
+Every jurisdiction is a profile over the same precompiled patterns. Each profile walks the
+document once: section/article headers and item markers are found by a single `finditer`
+over the cleaned text (or a single pass over the lines for US outline text), and entries
+are emitted as soon as their end is known, without re-splitting or re-cleaning the text.
+The output is identical to the original per-script regex code.
+"""
+import re
+
+from pipeline_stats import stage
+
+# Bump whenever a change to this module can change the entries it produces; the ingestion
+# CLI rebuilds every JSON whose recorded parser version differs
+PARSER_VERSION = "3"
+
+WORD_RE = re.compile(r'\b[\w\-]+\b')
+# Page footers: OCR reads "— 2 — Ch. 321"; the PDF text layer has "Ch. 321 — 2 —" on even
+# pages and "— 3 — Ch. 321" on odd ones
+FOOTER_RE = re.compile(r'—\s*\d+\s*—\s*Ch\.\s*\d+|Ch\.\s*\d+\s*—\s*\d+\s*—')
+LEADING_DASH_RE = re.compile(r'^[–—-]\s*')
+CLEAN_CHUNK = 1 << 20       # chars of text clean_noise collapses at a time
+
+# California: section headers like "SEC. 1", "SEC 2", "SECTION 3", "Section 27002"
+SECTION_HDR = r'(?:SEC\.?\s*\d+|SECTION\s+\d+|Section\s+\d+)'
+SECTION_HDR_RE = re.compile(SECTION_HDR, re.IGNORECASE)
+
+# Top-level article markers: (a), (b), (1), (2), (i), (ii), (iii), (iv), (v), (vi), (vii), (viii), (ix)
+# We only treat these as starts of new items when they appear as true markers.
+TOP_MARKER = (
+    r'\(\s*(?:'            # opening paren
+    r'[a-z]{1,2}'          # a..z (1-2 letters)  -> (a), (aa)
+    r'|'
+    r'\d{1,3}'             # 1..999              -> (1)
+    r'|'
+    r'ix|iv|v?i{0,3}'      # roman numerals up to ix
+    r')\s*\)\s+'           # closing paren + at least one space after marker
+)
+TOP_MARKER_RE = re.compile(TOP_MARKER)
+
+# Headers are split case-sensitively, as `re.split` on the bare pattern always did.
+# One scanner finds headers and markers together; a match starting with "(" is a marker.
+# (Named groups would be clearer but defeat the regex engine's first-character search.)
+SECTION_SPLIT_RE = re.compile(SECTION_HDR)
+SECTION_SCAN_RE = re.compile(f'{SECTION_HDR}|{TOP_MARKER}')
+
+# EU: "Article 1", "Article 2", ... and numbered paragraphs "1.", "2." opening an article
+ARTICLE_HDR = r'\bArticle\s+(\d+)\b'
+ARTICLE_HDR_RE = re.compile(ARTICLE_HDR, re.IGNORECASE)
+ARTICLE_SCAN_RE = re.compile(ARTICLE_HDR)
+NUMBERED_RE = re.compile(r'(\d+)\.\s+')
+
+# US Code outline text: one marker per line, "(a)Duty To Report.—"
+OUTLINE_MARKER_RE = re.compile(r'^\(?([a-z])\)\s*(.*)', re.IGNORECASE)
+
+# Full US Code hierarchy: subsection (a), paragraph (1), subparagraph (A), clause (i),
+# subclause (I), item (aa). A line may open with one marker; "(2)(A)" in running text is
+# a cross-reference, not structure.
+US_CODE_MARKER_RE = re.compile(r'^\(([a-z]{1,2}|[A-Z]{1,2}|\d{1,3}|[ivxl]{1,6}|[IVXL]{1,6})\)\s*(.*)')
+SOURCE_NOTE_RE = re.compile(r'^\((?:Added|Pub\. L\.|As amended)\b')    # trailing "(Added Pub. L. ...)" credits
+SENTENCE_END_RE = re.compile(r'(?<=[.;:?!])\s+')
+US_CODE_MAX_WORDS = 300   # context + text: keeps every entry comfortably inside one embedding call
+
+CALIFORNIA_ENACTMENT = "The people of the State of California do enact as follows"
+EU_ENACTMENT = "HAVE ADOPTED THIS REGULATION:"
+
+
+def word_count(text: str) -> int:
+    return len(WORD_RE.findall(text))
+
+
+def clean_noise(s: str, footers: bool = True) -> str:
+    # Basic de-noising for common footer/header artifacts from scans
+    if footers:
+        s = FOOTER_RE.sub(' ', s)
+    # Collapse whitespace and trim; str.split() uses the same whitespace set as `\s`
+    # but skips the regex engine, which is most of the cost on a long document
+    return _collapse_whitespace(s)
+
+
+def _collapse_whitespace(s: str, chunk: int = CLEAN_CHUNK) -> str:
+    # " ".join(s.split()), a chunk at a time: one split of a whole long document holds a
+    # str object per word at once, several times the size of the text itself. Chunks end
+    # at whitespace, so no word is cut and the joined result is the same.
+    if len(s) <= chunk:
+        return " ".join(s.split())
+    parts, start = [], 0
+    while start < len(s):
+        end = start + chunk
+        while end < len(s) and not s[end].isspace():
+            end += 1
+        part = " ".join(s[start:end].split())
+        if part:
+            parts.append(part)
+        start = end
+    return " ".join(parts)
+
+
+def text_after_enactment(full_text: str, phrase: str) -> str:
+    """Skip everything before the enactment phrase."""
+    idx = full_text.find(phrase)
+    return full_text[idx + len(phrase):].strip() if idx != -1 else full_text
+
+
+def _marker_body(text: str, start: int, end: int) -> str:
+    body = text[start:end].strip()
+    # Light cleanup of leading punctuation/dashes the OCR may capture
+    if body[:1] in ("–", "—", "-"):
+        body = LEADING_DASH_RE.sub('', body)
+    # The text is already cleaned, so only a footer pattern re-formed by the
+    # document-level cleanup can still be in here
+    if "—" in body:
+        body = clean_noise(body)
+    return body
+
+
+def iter_sections(text: str, kb_title: str, min_words: int = 2,
+                  enactment: str = CALIFORNIA_ENACTMENT, footers: bool = True):
+    """
+    California-style laws: split at SEC./SECTION headers, then yield one entry per top-level
+    marker ((a), (1), (ii) ...) running until the next marker or header.
+    - Ignores introductory material before the enactment phrase and before the first header.
+    - Skips any entry with fewer than `min_words`.
+    """
+    with stage("clean_noise"):
+        text = text_after_enactment(clean_noise(text, footers=footers), enactment)
+    current_section = None
+    pending = None           # (article_number, body start) of the marker still being read
+
+    def close(end):
+        if not (pending and current_section):
+            return None
+        body = _marker_body(text, pending[1], end)
+        wc = word_count(body)
+        if wc < min_words:
+            return None      # This prevents outputs like text="a" (wc=1).
+        return {
+            "kb": kb_title,
+            "article_number": pending[0],      # e.g., a, b, 1, i, ii
+            "type": current_section,           # the section header, e.g., "SEC. 2"
+            "text": body,
+            "word_count": wc
+        }
+
+    for m in SECTION_SCAN_RE.finditer(text):
+        if m.group(0)[0] == "(":
+            # A marker whose trailing space runs straight into a header was never a marker:
+            # the section's text used to be stripped before markers were searched
+            if not SECTION_SPLIT_RE.match(text, m.end()):
+                entry = close(m.start())
+                if entry:
+                    yield entry
+                pending = (m.group(0).strip().strip("() "), m.end())
+            continue
+
+        # A header closes the current section's last marker
+        entry = close(m.start())
+        if entry:
+            yield entry
+        pending = None
+        current_section = m.group(0)
+
+    entry = close(len(text))
+    if entry:
+        yield entry
+
+
+def iter_articles(text: str, kb_title: str, min_words: int = 2, enactment: str = EU_ENACTMENT):
+    """
+    EU-style regulations: split at "Article N" headers and yield the numbered paragraph
+    ("1. ...") that opens each article, running to the end of the article.
+    """
+    with stage("clean_noise"):
+        text = text_after_enactment(clean_noise(text, footers=False), enactment)
+
+    def close(header, start, end):
+        # Trim the article's text in place instead of slicing a stripped copy
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        # Text that itself opens with a differently-cased "ARTICLE n" counts as a header
+        # and carries no paragraphs of its own
+        if start == end or ARTICLE_HDR_RE.match(text, start, end):
+            return None
+        m = NUMBERED_RE.match(text, start, end)
+        if not m:
+            return None
+        body = text[m.end():end].strip()
+        wc = word_count(body)
+        if wc < min_words:
+            return None
+        return {
+            "kb": kb_title,
+            "article number": m.group(1),
+            "type": header,
+            "text": body,
+            "word count": wc
+        }
+
+    current = None           # (header, text start) of the article being read
+    for m in ARTICLE_SCAN_RE.finditer(text):
+        entry = close(current[0], current[1], m.start()) if current else None
+        if entry:
+            yield entry
+        current = (f"Article {m.group(1)}", m.end())
+    entry = close(current[0], current[1], len(text)) if current else None
+    if entry:
+        yield entry
+
+
+def iter_outline(text: str, kb_title: str, merge: bool = True, min_words: int = 0):
+    """
+    US Code outline text with one "(a)"-style marker per line. Lines without a marker are
+    appended to the current item. With `merge`, consecutive items are joined until one
+    ends with a full stop (the original txt_to_json_Reporting behaviour).
+    """
+    buffer = None            # [article_number, type, text] while merging
+
+    def make(marker, section, body):
+        wc = len(body.split())
+        if wc < min_words:
+            return None
+        return {
+            "kb": kb_title,
+            "article_number": marker,
+            "type": section,
+            "text": body,
+            "word_count": wc
+        }
+
+    def emit(marker, chunk):
+        nonlocal buffer
+        if not merge:
+            return make(marker, "Section " + marker, chunk)
+        if buffer is None:
+            buffer = [marker, "Section " + marker, ""]
+        buffer[2] += chunk
+        if buffer[2][-1:] in (".", "?", "!"):
+            # Text ends with full stop, save entry
+            done, buffer = buffer, None
+            return make(done[0], done[1], done[2].strip())
+        return None
+
+    current = None           # (marker, lines) of the item being read
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        m = OUTLINE_MARKER_RE.match(line)
+        if m:
+            entry = emit(current[0], " ".join(current[1]).strip()) if current else None
+            if entry:
+                yield entry
+            current = (m.group(1), [m.group(2)])
+        elif current:
+            current[1].append(line)
+    entry = emit(current[0], " ".join(current[1]).strip()) if current else None
+    if entry:
+        yield entry
+
+    # If any leftover text without full stop, save it anyway
+    if buffer is not None and buffer[2]:
+        entry = make(buffer[0], buffer[1], buffer[2].strip())
+        if entry:
+            yield entry
+
+
+_ROMAN = {"i": 1, "v": 5, "x": 10, "l": 50}
+
+
+def _roman_value(numeral: str) -> int:
+    """Integer value of a lowercase roman numeral, or 0 if it isn't a canonical one."""
+    if not numeral or any(c not in _ROMAN for c in numeral):
+        return 0
+    total = 0
+    for i, c in enumerate(numeral):
+        v = _ROMAN[c]
+        total += -v if i + 1 < len(numeral) and _ROMAN[numeral[i + 1]] > v else v
+    return total if _to_roman(total) == numeral else 0
+
+
+def _to_roman(n: int) -> str:
+    out = ""
+    for value, numeral in ((50, "l"), (40, "xl"), (10, "x"), (9, "ix"), (5, "v"), (4, "iv"), (1, "i")):
+        while n >= value:
+            out += numeral
+            n -= value
+    return out
+
+
+def _letter_value(letters: str) -> int:
+    # (a)..(z) then (aa), (bb) ... as the Code continues past z
+    if len(letters) == 2 and letters[0] != letters[1]:
+        return 0
+    return (ord(letters[0].lower()) - 96) + 26 * (len(letters) - 1)
+
+
+def _marker_levels(marker: str) -> list:
+    """Every (level, ordinal) a marker could stand for; ambiguous ones like (i) or (I) give several."""
+    levels = []
+    if marker.isdigit():
+        levels.append((1, int(marker)))
+    elif marker.islower():
+        if len(marker) == 1 or _letter_value(marker):
+            levels.append((0, _letter_value(marker)))
+        if _roman_value(marker):
+            levels.append((3, _roman_value(marker)))
+        if len(marker) == 2 and marker[0] == marker[1]:
+            levels.append((5, _letter_value(marker[0])))
+    else:
+        if len(marker) == 1 or _letter_value(marker):
+            levels.append((2, _letter_value(marker)))
+        if _roman_value(marker.lower()):
+            levels.append((4, _roman_value(marker.lower())))
+    return [(level, value) for level, value in levels if value]
+
+
+def _resolve_level(candidates: list, stack: list):
+    """
+    Pick the reading of a marker that continues the outline: the first child of the current
+    item, else the next sibling of the deepest open item it matches, else a first child a
+    level or more further down, else the shallowest reading.
+    """
+    depth = stack[-1]["level"] if stack else -1
+    for level, value in candidates:
+        if level == depth + 1 and value == 1:
+            return level, value
+    for node in reversed(stack):
+        for level, value in candidates:
+            if level == node["level"] and value == node["value"] + 1:
+                return level, value
+    for level, value in sorted(candidates):
+        if level > depth and value == 1:
+            return level, value
+    return min(candidates)
+
+
+def _split_words(text: str, max_words: int) -> list:
+    """Split text on sentence boundaries into parts of at most `max_words` words."""
+    if len(text.split()) <= max_words:
+        return [text]
+    parts, current = [], []
+    for sentence in SENTENCE_END_RE.split(text):
+        words = sentence.split()
+        # A single sentence longer than the budget is cut at word boundaries
+        while len(words) > max_words:
+            if current:
+                parts.append(" ".join(current))
+                current = []
+            parts.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        if current and len(current) + len(words) > max_words:
+            parts.append(" ".join(current))
+            current = []
+        current.extend(words)
+    if current:
+        parts.append(" ".join(current))
+    return parts
+
+
+def iter_us_code(text: str, kb_title: str, max_words: int = US_CODE_MAX_WORDS, min_words: int = 0):
+    """
+    US Code text with nested (a)/(1)/(A)/(i)/(I)/(aa) markers, one per line. A stack of open
+    items is kept while the lines are read once; each item is yielded when it closes, if it
+    turned out to be a leaf, with:
+    - article_number: the full citation path, e.g. "(d)(5)(A)(ii)(I)"
+    - parent: the parent's citation (None for top-level items)
+    - context: the lead-in text of its ancestors ("The Attorney General may—" ...)
+    A leaf whose text and context together run over `max_words` is split on sentence
+    boundaries into numbered parts; the context goes with every part, so it counts against
+    each part's budget (though at least a quarter of the budget is left for the text).
+    """
+    stack = []               # open items: marker, level, value, citation, lines, has_children
+
+    def close(node):
+        if node["has_children"]:
+            return
+        body = " ".join(node["lines"]).strip()
+        ancestors = stack[:-1] if stack and stack[-1] is node else stack
+        context = " ".join(" ".join(a["lines"]).strip() for a in ancestors).strip()
+        budget = max(max_words - len(context.split()), max_words // 4)
+        parts = _split_words(body, budget) if body else []
+        for i, part in enumerate(parts, start=1):
+            wc = len(part.split())
+            if wc < min_words:
+                continue
+            entry = {
+                "kb": kb_title,
+                "article_number": node["citation"],
+                "type": "Section " + (ancestors[0]["marker"] if ancestors else node["marker"]),
+                "text": part,
+                "word_count": wc,
+                "parent": ancestors[-1]["citation"] if ancestors else None,
+                "context": context,
+            }
+            if len(parts) > 1:
+                entry["part"] = i
+            yield entry
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or SOURCE_NOTE_RE.match(line):
+            continue
+        m = US_CODE_MARKER_RE.match(line)
+        candidates = _marker_levels(m.group(1)) if m else []
+        if not candidates:
+            if stack:
+                stack[-1]["lines"].append(line)
+            continue
+
+        level, value = _resolve_level(candidates, stack)
+        while stack and stack[-1]["level"] >= level:
+            yield from close(stack[-1])
+            stack.pop()
+        if stack:
+            stack[-1]["has_children"] = True
+        citation = (stack[-1]["citation"] if stack else "") + f"({m.group(1)})"
+        stack.append({"marker": m.group(1), "level": level, "value": value, "citation": citation,
+                      "lines": [m.group(2)] if m.group(2) else [], "has_children": False})
+
+    while stack:
+        yield from close(stack[-1])
+        stack.pop()
+
+
+def parse_sections(text: str, kb_title: str, **options) -> list:
+    return list(iter_sections(text, kb_title, **options))
+
+
+def parse_articles(text: str, kb_title: str, **options) -> list:
+    return list(iter_articles(text, kb_title, **options))
+
+
+def parse_outline(text: str, kb_title: str, **options) -> list:
+    return list(iter_outline(text, kb_title, **options))
+
+
+def parse_us_code(text: str, kb_title: str, **options) -> list:
+    return list(iter_us_code(text, kb_title, **options))
+
+
+# Jurisdiction profiles: which parser to run and the options it was tuned with
+PROFILES = {
+    "california": {"parser": iter_sections, "options": {"enactment": CALIFORNIA_ENACTMENT}},
+    "eu": {"parser": iter_articles, "options": {"enactment": EU_ENACTMENT}},
+    "us_outline": {"parser": iter_outline, "options": {"merge": False}},
+    "us_outline_merged": {"parser": iter_outline, "options": {"merge": True}},
+    "us_code": {"parser": iter_us_code, "options": {"max_words": US_CODE_MAX_WORDS}},
+}
+
+
+def iter_document(profile: str, text: str, kb_title: str, **options):
+    """Yield a whole document's entries with one of the PROFILES; keyword options override its defaults."""
+    spec = PROFILES[profile]
+    return spec["parser"](text, kb_title, **{**spec["options"], **options})
+
+
+def parse_document(profile: str, text: str, kb_title: str, **options) -> list:
+    return list(iter_document(profile, text, kb_title, **options))
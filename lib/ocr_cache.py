@@ -0,0 +1,215 @@
+"""
+On-disk cache of per-page OCR text, so re-running the ingestion scripts skips Tesseract.
+
+Layout:  <cache dir>/<sha256 of the PDF bytes>/p<page>-<dpi>dpi-<engine key>.txt
+         <cache dir>/pages/<sha256 of the rendered page>-<dpi>dpi-<engine key>.txt
+The engine key hashes the Tesseract version and config, so upgrading Tesseract or changing
+its options never serves stale text.
+
+The first layout answers "this exact PDF again" without rendering anything. The second is
+keyed by the page's pixels, so an amended PDF (a new file hash) still reuses the text of
+every page that renders the same as before and only the changed pages go through Tesseract.
+Each PDF's directory also lists the fingerprints of its pages (<sha256>/fingerprints), so
+invalidating a PDF drops its pixel-addressed text as well and really forces a re-OCR.
+
+    python ocr_cache.py stats
+    python ocr_cache.py invalidate laws_pdf_file/EU_Digital_Service_Act.pdf
+    python ocr_cache.py invalidate --all
+    python ocr_cache.py evict --max-mb 256
+"""
+import argparse
+import hashlib
+import os
+import shutil
+from functools import cached_property, lru_cache
+
+PAGE_DIR = "pages"     # fingerprint-addressed page text, shared by every PDF
+FINGERPRINTS = "fingerprints"     # per-PDF list of the page fingerprints it was read with
+CACHE_DIR = os.environ.get("OCR_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ocr_cache"))
+MAX_CACHE_MB = int(os.environ.get("OCR_CACHE_MAX_MB", "512"))
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def tesseract_version() -> str:
+    import pytesseract
+    return str(pytesseract.get_tesseract_version())
+
+
+def engine_key(config: str) -> str:
+    """Short hash identifying the OCR engine + options that produced a page's text."""
+    return hashlib.sha256(f"tesseract {tesseract_version()}|{config}".encode("utf-8")).hexdigest()[:16]
+
+
+def _read_text(path: str):
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+    os.utime(path)   # mark as recently used for eviction
+    return text
+
+
+def _write_text(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    os.replace(tmp, path)   # readers never see a half-written page
+
+
+def page_suffix(dpi: int, config: str = "") -> str:
+    return f"-{dpi}dpi-{engine_key(config)}.txt"
+
+
+def get_by_fingerprint(fingerprint: str, suffix: str, cache_dir: str = None):
+    """Text of a page whose rendered pixels hash to `fingerprint`, from whichever PDF had it."""
+    return _read_text(os.path.join(cache_dir or CACHE_DIR, PAGE_DIR, fingerprint + suffix))
+
+
+def put_by_fingerprint(fingerprint: str, suffix: str, text: str, cache_dir: str = None):
+    _write_text(os.path.join(cache_dir or CACHE_DIR, PAGE_DIR, fingerprint + suffix), text)
+
+
+class OcrCache:
+    """Per-page OCR text for one PDF, addressed by content hash rather than by path."""
+
+    def __init__(self, pdf_file: str, dpi: int, config: str = "", cache_dir: str = None):
+        self.cache_dir = cache_dir or CACHE_DIR
+        self.doc_hash = file_sha256(pdf_file)
+        self.doc_dir = os.path.join(self.cache_dir, self.doc_hash)
+        self.dpi, self.config = dpi, config
+
+    @cached_property
+    def suffix(self) -> str:
+        # Computed on first use: the engine key runs `tesseract --version`, which a PDF
+        # read entirely from its text layer never needs
+        return page_suffix(self.dpi, self.config)
+
+    def _path(self, page_number: int) -> str:
+        return os.path.join(self.doc_dir, f"p{page_number}{self.suffix}")
+
+    def get(self, page_number: int):
+        return _read_text(self._path(page_number))
+
+    def put(self, page_number: int, text: str):
+        _write_text(self._path(page_number), text)
+
+    def get_by_fingerprint(self, fingerprint: str):
+        return get_by_fingerprint(fingerprint, self.suffix, self.cache_dir)
+
+    def put_by_fingerprint(self, fingerprint: str, text: str):
+        put_by_fingerprint(fingerprint, self.suffix, text, self.cache_dir)
+
+    def add_fingerprint(self, fingerprint: str):
+        """Note that one of this PDF's pages was read through `fingerprint`, for invalidate()."""
+        os.makedirs(self.doc_dir, exist_ok=True)
+        with open(os.path.join(self.doc_dir, FINGERPRINTS), "a", encoding="ascii") as f:
+            f.write(fingerprint + "\n")
+
+    # The page count lets a fully warm run skip pdfinfo as well as pdftoppm + Tesseract
+    def get_page_count(self):
+        try:
+            with open(os.path.join(self.doc_dir, "pages"), "r") as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put_page_count(self, pages: int):
+        os.makedirs(self.doc_dir, exist_ok=True)
+        with open(os.path.join(self.doc_dir, "pages"), "w") as f:
+            f.write(str(pages))
+
+
+def _cache_files(cache_dir: str):
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            yield path, st.st_size, st.st_mtime
+
+
+def cache_size(cache_dir: str = None) -> int:
+    return sum(size for _, size, _ in _cache_files(cache_dir or CACHE_DIR))
+
+
+def evict(max_bytes: int = MAX_CACHE_MB * 1024 * 1024, cache_dir: str = None) -> int:
+    """Delete least-recently-used pages until the cache fits in `max_bytes`. Returns files removed."""
+    cache_dir = cache_dir or CACHE_DIR
+    files = sorted(_cache_files(cache_dir), key=lambda f: f[2])
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for path, size, _ in files:
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+        removed += 1
+    # Drop document directories that no longer hold any page text
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            doc_dir = os.path.join(cache_dir, name)
+            if os.path.isdir(doc_dir) and not any(n.endswith(".txt") for n in os.listdir(doc_dir)):
+                shutil.rmtree(doc_dir, ignore_errors=True)
+    return removed
+
+
+def invalidate(pdf_file: str = None, cache_dir: str = None):
+    """
+    Forget the cached pages of one PDF, or of every PDF when `pdf_file` is None.
+    A PDF's fingerprint-addressed pages go too, at every dpi and engine key, so its next
+    read OCRs every page again; another PDF sharing one of those pages still has its own
+    per-page copy and only re-OCRs it after being invalidated as well.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    if pdf_file is None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return
+    doc_dir = os.path.join(cache_dir, file_sha256(pdf_file))
+    try:
+        with open(os.path.join(doc_dir, FINGERPRINTS), "r", encoding="ascii") as f:
+            fingerprints = set(f.read().split())
+    except FileNotFoundError:
+        fingerprints = set()
+    page_dir = os.path.join(cache_dir, PAGE_DIR)
+    if fingerprints and os.path.isdir(page_dir):
+        for name in os.listdir(page_dir):
+            if name.split("-", 1)[0] in fingerprints:
+                os.remove(os.path.join(page_dir, name))
+    shutil.rmtree(doc_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="show the cache location and size")
+    inv = sub.add_parser("invalidate", help="drop cached pages for the given PDFs")
+    inv.add_argument("pdf_files", nargs="*")
+    inv.add_argument("--all", action="store_true", help="drop the whole cache")
+    ev = sub.add_parser("evict", help="trim the cache to a size limit, oldest pages first")
+    ev.add_argument("--max-mb", type=int, default=MAX_CACHE_MB)
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        docs = len([n for n in os.listdir(CACHE_DIR) if n != PAGE_DIR]) if os.path.isdir(CACHE_DIR) else 0
+        print(f"{CACHE_DIR}: {docs} documents, {cache_size() / (1024 * 1024):.1f} MB")
+    elif args.command == "invalidate":
+        if args.all:
+            invalidate()
+            print(f"🗑️  Cleared {CACHE_DIR}")
+        elif not args.pdf_files:
+            parser.error("give one or more PDFs, or --all")
+        for pdf_file in args.pdf_files:
+            invalidate(pdf_file)
+            print(f"🗑️  Invalidated cached OCR for {pdf_file}")
+    elif args.command == "evict":
+        removed = evict(args.max_mb * 1024 * 1024)
+        print(f"🗑️  Evicted {removed} cached pages (limit {args.max_mb} MB)")
@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+import subprocess
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pdf2image import convert_from_path, pdfinfo_from_path
+import pytesseract
+
+import pipeline_stats
+from ocr_cache import OcrCache, evict
+from ocr_preprocess import STEPS as PREPROCESS_STEPS, VERSION as PREPROCESS_VERSION, preprocess as preprocess_image
+from pipeline_stats import cpu_seconds, stage
+
+# Optional: if Tesseract isn't on PATH, uncomment & set the absolute path
+# pytesseract.pytesseract.tesseract_cmd = "/usr/local/bin/tesseract"
+
+DEFAULT_DPI = 200        # pdf2image's own default, so the OCR input is unchanged
+DEFAULT_BATCH_SIZE = 4   # pages rasterized at once; bounds peak memory regardless of page count
+TESSERACT_CONFIG = ""    # extra tesseract CLI options; part of the OCR cache key
+MIN_TEXT_LAYER_CHARS = 40      # fewer visible characters than this means "scanned page"
+MIN_TEXT_LAYER_CLEAN = 0.9     # share of letters/digits/punctuation a usable text layer must have
+PREPROCESS = ()                # ocr_preprocess steps run before Tesseract; () sends raw pages
+
+
+def _init_worker():
+    # Tesseract spawns its own OpenMP threads per page; with one page per process
+    # that just oversubscribes the cores, so pin each worker to a single thread.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def resolve_workers(workers) -> int:
+    """`None`/0 means one worker per core; anything below 1 falls back to serial."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def page_count(pdf_file: str) -> int:
+    return int(pdfinfo_from_path(pdf_file)["Pages"])
+
+
+def render_pages(pdf_file: str, first_page: int, last_page: int, dpi: int = DEFAULT_DPI) -> list:
+    """Rasterize the 1-based, inclusive page window [first_page, last_page]."""
+    return convert_from_path(pdf_file, dpi=dpi, first_page=first_page, last_page=last_page)
+
+
+def _page_windows(page_numbers, batch_size: int):
+    """Group sorted page numbers into runs of consecutive pages, at most `batch_size` long."""
+    window = []
+    for number in page_numbers:
+        if window and (number != window[-1] + 1 or len(window) == batch_size):
+            yield window[0], window[-1]
+            window = []
+        window.append(number)
+    if window:
+        yield window[0], window[-1]
+
+
+def iter_page_images(pdf_file: str, dpi: int = DEFAULT_DPI, batch_size: int = DEFAULT_BATCH_SIZE,
+                     page_numbers=None):
+    """
+    Yield (page_number, image) one page at a time, rendering `batch_size` pages per
+    pdftoppm call. Each image is closed once the consumer moves on, so at most one
+    batch is ever held in memory. `page_numbers` restricts rendering to those pages.
+    """
+    if page_numbers is None:
+        page_numbers = range(1, page_count(pdf_file) + 1)
+    for first, last in _page_windows(page_numbers, batch_size):
+        with stage("rasterize", pages=last - first + 1):
+            batch = render_pages(pdf_file, first, last, dpi=dpi)
+        for offset in range(len(batch)):
+            image = batch[offset]
+            batch[offset] = None          # drop the list's reference so the bitmap can be freed
+            try:
+                yield first + offset, image
+            finally:
+                image.close()
+
+
+def extract_text_layer(pdf_file: str) -> list:
+    """
+    Embedded text of every page via poppler's pdftotext (already installed for pdf2image).
+    pdftotext ends each page with a form feed, so one call covers the whole document.
+    """
+    out = subprocess.run(["pdftotext", "-enc", "UTF-8", pdf_file, "-"],
+                         capture_output=True, check=True).stdout.decode("utf-8", errors="replace")
+    pages = out.split("\f")
+    return pages[:-1] if pages and not pages[-1].strip() else pages
+
+
+def has_text_layer(text: str) -> bool:
+    """True when a page's embedded text looks real rather than empty (scans) or glyph garbage."""
+    visible = [c for c in text if not c.isspace()]
+    if len(visible) < MIN_TEXT_LAYER_CHARS:
+        return False
+    # Fonts without a unicode map come out as private-use glyphs, control chars or U+FFFD
+    clean = sum(1 for c in visible if unicodedata.category(c)[0] in "LNPS" and c != "\ufffd")
+    return clean / len(visible) >= MIN_TEXT_LAYER_CLEAN
+
+
+def ocr_page(image, preprocess=PREPROCESS) -> str:
+    """Tesseract text of one rendered page, after the given ocr_preprocess steps."""
+    if preprocess:
+        with stage("preprocess"):
+            image, _ = preprocess_image(image, preprocess)
+    return pytesseract.image_to_string(image, config=TESSERACT_CONFIG)
+
+
+def cache_config(preprocess=PREPROCESS) -> str:
+    # Preprocessing changes the OCR text, so the steps (and their version) are part of the
+    # cache key; without it the key is the plain Tesseract config, as before
+    steps = ",".join(step for step in PREPROCESS_STEPS if step in preprocess)
+    return f"{TESSERACT_CONFIG}|preprocess={steps}|v{PREPROCESS_VERSION}" if preprocess else TESSERACT_CONFIG
+
+
+def page_fingerprint(image) -> str:
+    """Hash of a rendered page's pixels; pages that render identically OCR identically."""
+    digest = hashlib.sha256(f"{image.mode}{image.size}".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def _read_page_image(image, ocr_cache=None, preprocess=PREPROCESS):
+    """
+    OCR text of one rendered page, reusing the text of an identical page seen before
+    (in this PDF or any other) when `ocr_cache` is given.
+    Returns (text, reused, fingerprint or None).
+    """
+    if ocr_cache is None:
+        return ocr_page(image, preprocess), False, None
+    with stage("fingerprint", pages=1):
+        fingerprint = page_fingerprint(image)
+        text = ocr_cache.get_by_fingerprint(fingerprint)
+    if text is not None:
+        return text, True, fingerprint
+    text = ocr_page(image, preprocess)
+    ocr_cache.put_by_fingerprint(fingerprint, text)
+    return text, False, fingerprint
+
+
+def _ocr_pdf_page(pdf_file: str, page_number: int, dpi: int, ocr_cache, preprocess=PREPROCESS):
+    # Runs in a pool worker: render just this page, OCR it (unless its fingerprint is
+    # cached), free it. The worker times itself and returns (text, reused, fingerprint,
+    # {stage: (wall, cpu)}) for the parent's run stats.
+    wall, cpu = time.perf_counter(), cpu_seconds()
+    image = render_pages(pdf_file, page_number, page_number, dpi=dpi)[0]
+    rendered_wall, rendered_cpu = time.perf_counter(), cpu_seconds()
+    try:
+        text, reused, fingerprint = _read_page_image(image, ocr_cache, preprocess)
+    finally:
+        image.close()
+    timings = {"rasterize": (rendered_wall - wall, rendered_cpu - cpu),
+               "fingerprint" if reused else "ocr": (time.perf_counter() - rendered_wall, cpu_seconds() - rendered_cpu)}
+    return text, reused, fingerprint, timings
+
+
+def _ocr_page_numbers(pdf_file: str, page_numbers: list, workers: int, dpi: int, batch_size: int,
+                      ocr_cache=None, preprocess=PREPROCESS):
+    """Yield (text, reused, fingerprint) for `page_numbers`, in that order."""
+    workers = min(resolve_workers(workers), len(page_numbers))
+
+    if workers <= 1:
+        for _, image in iter_page_images(pdf_file, dpi=dpi, batch_size=batch_size, page_numbers=page_numbers):
+            with stage("ocr", pages=1):
+                text, reused, fingerprint = _read_page_image(image, ocr_cache, preprocess)
+            pipeline_stats.add("ocr", calls=0, chars=len(text), reused=int(reused))
+            yield text, reused, fingerprint
+        return
+
+    count = len(page_numbers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for text, reused, fingerprint, timings in pool.map(_ocr_pdf_page, [pdf_file] * count, page_numbers,
+                                                           [dpi] * count, [ocr_cache] * count,
+                                                           [preprocess] * count):
+            for name, (wall, cpu) in timings.items():
+                pipeline_stats.add(name, wall, cpu, pages=1)
+            pipeline_stats.add("ocr", calls=0, chars=len(text), reused=int(reused))
+            yield text, reused, fingerprint
+
+
+def read_pdf_pages(pdf_file: str, workers: int = 1, dpi: int = DEFAULT_DPI,
+                   batch_size: int = DEFAULT_BATCH_SIZE, cache: bool = True, text_layer: bool = True,
+                   preprocess=PREPROCESS, cache_dir: str = None):
+    """
+    Text of every page of a PDF, in page order, plus how each page was read.
+    Returns (page_texts, sources) where each source is "text" (embedded text layer) or "ocr".
+    - text_layer=True takes born-digital pages straight from the PDF; only pages without
+      a usable text layer go through Tesseract.
+    - workers=1 streams pages through Tesseract in this process, `batch_size` at a time.
+    - workers>1 OCRs pages concurrently in a process pool; each worker rasterizes only
+      its own page, so at most `workers` bitmaps exist at once. `map` keeps page order.
+    - cache=True reuses per-page text from the OCR cache (see ocr_cache.py); only pages
+      missing from it are rasterized, and of those only pages whose rendered pixels
+      were never seen before (e.g. the amended pages of a new edition) are OCR'd.
+      `cache_dir` overrides the cache location (default ocr_cache.CACHE_DIR).
+    - preprocess lists ocr_preprocess steps (grayscale, deskew, rescale, binarize, crop)
+      applied to each page before Tesseract; see bench_preprocess.py for their effect.
+    """
+    ocr_cache = OcrCache(pdf_file, dpi, cache_config(preprocess), cache_dir) if cache else None
+
+    total = ocr_cache.get_page_count() if ocr_cache else None
+    if total is None:
+        total = page_count(pdf_file)
+        if ocr_cache:
+            ocr_cache.put_page_count(total)
+
+    numbers = range(1, total + 1)
+    page_texts = [None] * total
+    sources = ["ocr"] * total
+
+    if text_layer:
+        with stage("text_layer"):
+            for number, text in zip(numbers, extract_text_layer(pdf_file)):
+                if has_text_layer(text):
+                    page_texts[number - 1] = text
+                    sources[number - 1] = "text"
+        pipeline_stats.add("text_layer", calls=0, pages=sources.count("text"),
+                           chars=sum(len(t) for t in page_texts if t is not None))
+
+    if ocr_cache:
+        with stage("cache"):
+            for number in numbers:
+                if page_texts[number - 1] is None:
+                    page_texts[number - 1] = ocr_cache.get(number)
+    missing = [n for n in numbers if page_texts[n - 1] is None]
+
+    if not missing:
+        return page_texts, sources
+
+    if ocr_cache:
+        ocr_cache.suffix      # resolve the engine key here once, not in every pool worker
+    for number, (text, _, fingerprint) in zip(missing, _ocr_page_numbers(pdf_file, missing, workers, dpi,
+                                                                         batch_size, ocr_cache, preprocess)):
+        page_texts[number - 1] = text
+        if ocr_cache:
+            with stage("cache"):
+                ocr_cache.put(number, text)
+                ocr_cache.add_fingerprint(fingerprint)
+
+    if ocr_cache:
+        with stage("cache"):
+            evict(cache_dir=ocr_cache.cache_dir)
+    return page_texts, sources
+
+
+def ocr_pdf_pages(pdf_file: str, workers: int = 1, dpi: int = DEFAULT_DPI, batch_size: int = DEFAULT_BATCH_SIZE,
+                  cache: bool = True, preprocess=PREPROCESS, cache_dir: str = None) -> list:
+    """OCR every page of a PDF (ignoring any text layer) and return one string per page."""
+    return read_pdf_pages(pdf_file, workers=workers, dpi=dpi, batch_size=batch_size, cache=cache,
+                          text_layer=False, preprocess=preprocess, cache_dir=cache_dir)[0]
+
+
+def join_pages(page_texts) -> str:
+    # Same layout the scripts always produced: each page followed by a newline
+    return "".join(text + "\n" for text in page_texts)
+
+
+def ocr_pdf_text(pdf_file: str, workers: int = 1, dpi: int = DEFAULT_DPI,
+                 batch_size: int = DEFAULT_BATCH_SIZE, cache: bool = True) -> str:
+    """OCR a PDF into one string, byte-identical to the serial page loop."""
+    return join_pages(ocr_pdf_pages(pdf_file, workers=workers, dpi=dpi, batch_size=batch_size, cache=cache))
+
+
+def page_report_path(json_file: str) -> str:
+    # Kept in a subfolder so laws_json_file/*.json stays a list of law entry files
+    return os.path.join(os.path.dirname(json_file), "pages", os.path.basename(json_file))
+
+
+def document_source(sources: list) -> str:
+    """How a PDF was read: "text" or "ocr" when every page went the same way, else "mixed"."""
+    return sources[0] if len(set(sources)) == 1 else "mixed"
+
+
+def with_source(entries, sources: list):
+    """
+    Yield `entries` with the PDF's extraction source (document_source) as their "source",
+    so the published JSON says how its text was read; the per-page detail stays in the
+    page report.
+    """
+    source = document_source(sources)
+    for entry in entries:
+        entry["source"] = source
+        yield entry
+
+
+def write_page_report(json_file: str, pdf_file: str, sources: list):
+    """Record which extraction path each page took, next to the entries JSON."""
+    path = page_report_path(json_file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    report = {
+        "pdf": pdf_file,
+        "pages": [{"page": n, "source": src} for n, src in enumerate(sources, start=1)],
+        "text_pages": sources.count("text"),
+        "ocr_pages": sources.count("ocr"),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
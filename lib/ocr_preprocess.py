@@ -0,0 +1,203 @@
+"""
+Optional image clean-up between rasterization and Tesseract.
+
+Steps, applied in this order when listed in `steps`:
+- "grayscale": drop colour; Tesseract does this anyway, but on a 3x larger bitmap.
+- "deskew":    straighten pages scanned a few degrees off, by maximising the variance of
+               the row-ink profile over small rotations.
+- "rescale":   resample the rendered bitmap so the detected text lines come out about
+               TARGET_LINE_PX tall: small print is enlarged, oversized scans shrink. This
+               interpolates the pixels rendered at ocr_pages' dpi; it is not a re-render at
+               another DPI, so it adds no detail a higher `dpi` would have.
+- "binarize":  Otsu threshold to a 1-bit image (much less for Tesseract to threshold and
+               pytesseract to write to its temp file).
+- "crop":      trim the blank margins and drop an isolated header/footer line at the very
+               top/bottom of the page, e.g. the "— 2 — Ch. 321" band clean_noise scrubs.
+
+Only "grayscale" and "binarize" change the page's mode. deskew, rescale and crop measure
+the page on a grey copy but transform the page as it is, so e.g. ("deskew",) hands
+Tesseract a straightened colour page.
+
+Only Pillow (already required by pdf2image) is used. Each step is cheap next to OCR; the
+benchmark in bench_preprocess.py reports seconds/page and the text-accuracy delta.
+"""
+from PIL import Image, ImageOps
+
+STEPS = ("grayscale", "deskew", "rescale", "binarize", "crop")
+# Bump whenever a change can change the image a list of steps produces; it is part of the
+# OCR cache key (ocr_pages.cache_config)
+VERSION = "2"
+
+DESKEW_MAX_ANGLE = 3.0          # degrees searched either way
+DESKEW_STEP = 0.25
+DESKEW_MIN_ANGLE = 0.2          # smaller skews aren't worth a full-page rotation
+PROBE_WIDTH = 800               # thumbnails used for deskew and line-height detection
+TARGET_LINE_PX = 40             # ascender-to-descender height Tesseract reads best (~30px caps)
+RESCALE_LIMITS = (0.5, 2.0)     # never shrink/enlarge beyond this
+RESCALE_TOLERANCE = 0.15        # leave the page alone when within ±15% of the target
+INK_ROW = 0.01                  # a row with more than 1% dark pixels is part of a text line
+MARGIN_PAD = 12                 # pixels kept around the content when cropping
+EDGE_BAND = 0.08                # header/footer lines must sit in the top/bottom 8% of the page
+EDGE_GAP = 2.5                  # ... and be separated from the body by 2.5x the usual line gap
+
+
+def _gray(image):
+    return image if image.mode == "L" else ImageOps.grayscale(image)
+
+
+def otsu_threshold(gray) -> int:
+    """Grey level that best separates ink from paper (Otsu's method on the histogram)."""
+    hist = gray.histogram()[:256]
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg = weight_bg = 0
+    best, threshold = -1.0, 128
+    for level, count in enumerate(hist):
+        weight_bg += count
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += level * count
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, level
+    return threshold
+
+
+def _ink_mask(gray, threshold: int):
+    """White-on-black mask of the ink (255 = ink), as an "L" image."""
+    return gray.point(lambda v: 255 if v <= threshold else 0)
+
+
+def row_profile(mask) -> list:
+    """Share of ink pixels in each row of an ink mask."""
+    column = mask.resize((1, mask.height), Image.BOX)
+    return [v / 255 for v in column.getdata()]
+
+
+def line_bands(profile: list) -> list:
+    """(first row, last row) of every run of inked rows, i.e. of every text line."""
+    bands, start = [], None
+    for row, ink in enumerate(profile):
+        if ink > INK_ROW and start is None:
+            start = row
+        elif ink <= INK_ROW and start is not None:
+            bands.append((start, row - 1))
+            start = None
+    if start is not None:
+        bands.append((start, len(profile) - 1))
+    return bands
+
+
+def _median(values: list) -> float:
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2] if ordered else 0
+
+
+def _probe(gray):
+    """Downscaled ink mask used to measure the page, and its scale relative to `gray`."""
+    scale = min(1.0, PROBE_WIDTH / gray.width)
+    small = gray.resize((max(1, int(gray.width * scale)), max(1, int(gray.height * scale))), Image.BILINEAR) \
+        if scale < 1.0 else gray
+    return _ink_mask(small, otsu_threshold(small)), scale
+
+
+def skew_angle(gray) -> float:
+    """Rotation (degrees) that makes the text lines horizontal, or 0.0."""
+    mask, _ = _probe(gray)
+    low, high = mask.getextrema()
+    if low == high:                         # blank or solid page: nothing to straighten
+        return 0.0
+
+    def score(angle):
+        profile = row_profile(mask.rotate(angle, resample=Image.NEAREST, fillcolor=0))
+        mean = sum(profile) / len(profile)
+        return sum((p - mean) ** 2 for p in profile)
+
+    # Stay at 0° unless some angle scores strictly better, so ties never rotate the page
+    steps = int(DESKEW_MAX_ANGLE / DESKEW_STEP)
+    best, best_score = 0.0, score(0.0)
+    for angle in (i * DESKEW_STEP for i in range(-steps, steps + 1) if i):
+        angle_score = score(angle)
+        if angle_score > best_score:
+            best, best_score = angle, angle_score
+    return best if abs(best) >= DESKEW_MIN_ANGLE else 0.0
+
+
+def line_height(gray) -> float:
+    """Median text line height in pixels of `gray`, or 0 when the page has no text lines."""
+    mask, scale = _probe(gray)
+    heights = [last - first + 1 for first, last in line_bands(row_profile(mask))]
+    heights = [h for h in heights if h > 1]      # specks and rules aren't lines
+    return _median(heights) / scale if heights else 0.0
+
+
+def rescale_factor(gray) -> float:
+    height = line_height(gray)
+    if not height:
+        return 1.0
+    factor = min(max(TARGET_LINE_PX / height, RESCALE_LIMITS[0]), RESCALE_LIMITS[1])
+    return 1.0 if abs(factor - 1.0) <= RESCALE_TOLERANCE else factor
+
+
+def crop_box(mask) -> tuple:
+    """Bounding box of the page's content, without margins or an isolated header/footer line."""
+    bbox = mask.getbbox()
+    if bbox is None:
+        return None
+    left, top, right, bottom = bbox
+    bands = line_bands(row_profile(mask))
+    if len(bands) >= 3:
+        gaps = [b[0] - a[1] for a, b in zip(bands, bands[1:])]
+        usual = max(1, _median(gaps))
+        if bands[0][1] < mask.height * EDGE_BAND and gaps[0] > EDGE_GAP * usual:
+            top = bands[1][0]
+        if bands[-1][0] > mask.height * (1 - EDGE_BAND) and gaps[-1] > EDGE_GAP * usual:
+            bottom = bands[-2][1] + 1
+    return (max(0, left - MARGIN_PAD), max(0, top - MARGIN_PAD),
+            min(mask.width, right + MARGIN_PAD), min(mask.height, bottom + MARGIN_PAD))
+
+
+def preprocess(image, steps=STEPS):
+    """
+    Return (image ready for Tesseract, info) where info records what each step did:
+    {"angle": deskew rotation, "scale": rescale factor, "crop": box}.
+    The input image is left untouched, and keeps its mode unless "grayscale" or "binarize"
+    is listed.
+    """
+    info = {}
+    steps = set(steps)
+    unknown = steps - set(STEPS)
+    if unknown:
+        raise ValueError(f"Unknown preprocessing step(s): {', '.join(sorted(unknown))}")
+    out = _gray(image) if "grayscale" in steps else image
+
+    if "deskew" in steps:
+        angle = skew_angle(_gray(out))
+        if angle:
+            out = out.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor="white")
+        info["angle"] = angle
+
+    if "rescale" in steps:
+        factor = rescale_factor(_gray(out))
+        if factor != 1.0:
+            out = out.resize((round(out.width * factor), round(out.height * factor)), Image.LANCZOS)
+        info["scale"] = factor
+
+    gray = _gray(out) if steps & {"binarize", "crop"} else None
+    threshold = otsu_threshold(gray) if gray is not None else None
+
+    if "crop" in steps:
+        box = crop_box(_ink_mask(gray, threshold))
+        if box:
+            out, gray = out.crop(box), gray.crop(box)
+        info["crop"] = box
+
+    if "binarize" in steps:
+        out = gray.point(lambda v: 255 if v > threshold else 0).convert("1", dither=Image.Dither.NONE)
+
+    return out, info
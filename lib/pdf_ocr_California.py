@@ -1,129 +1,61 @@
-import os
-import re
-import json
-from pdf2image import convert_from_path
-import pytesseract
-
-# Optional: if Tesseract isn't on PATH, uncomment & set the absolute path
-# pytesseract.pytesseract.tesseract_cmd = "/usr/local/bin/tesseract"
+import pipeline_stats
+from law_io import write_entries
+from law_parser import iter_document
+from ocr_pages import read_pdf_pages, join_pages, with_source, write_page_report
+from pipeline_stats import RunStats, recording, stage, timed_iter
 
 ENACTMENT_PHRASE = "The people of the State of California do enact as follows"
 
-# Matches section headers like "SEC. 1", "SEC 2", "SECTION 3", "Section 27002"
-SECTION_HDR_RE = re.compile(r'(?:SEC\.?\s*\d+|SECTION\s+\d+|Section\s+\d+)', re.IGNORECASE)
-
-# Top-level article markers: (a), (b), (1), (2), (i), (ii), (iii), (iv), (v), (vi), (vii), (viii), (ix)
-# We only treat these as starts of new items when they appear as true markers.
-TOP_MARKER_RE = re.compile(
-    r'\(\s*(?:'            # opening paren
-    r'[a-z]{1,2}'          # a..z (1-2 letters)  -> (a), (aa)
-    r'|'
-    r'\d{1,3}'             # 1..999              -> (1)
-    r'|'
-    r'ix|iv|v?i{0,3}'      # roman numerals up to ix
-    r')\s*\)\s+'           # closing paren + at least one space after marker
-)
-
-def word_count(text: str) -> int:
-    return len(re.findall(r'\b[\w\-]+\b', text))
-
-def clean_noise(s: str) -> str:
-    # Basic de-noising for common footer/header artifacts from scans
-    s = re.sub(r'—\s*\d+\s*—\s*Ch\.\s*\d+', ' ', s)   # e.g., "— 2 — Ch. 321"
-    s = re.sub(r'\s+', ' ', s)                        # collapse whitespace
-    return s.strip()
-
-def text_after_enactment(full_text: str) -> str:
-    idx = full_text.find(ENACTMENT_PHRASE)
-    return full_text[idx + len(ENACTMENT_PHRASE):].strip() if idx != -1 else full_text
-
-def extract_articles_from_chunk(chunk: str, current_section: str, doc_title: str, min_words: int = 2):
-    """
-    From the text belonging to one Section, extract entries that start at each top-level marker
-    and run until the next top-level marker. Skip entries with < min_words.
-    """
-    entries = []
-    # Find all marker occurrences and slice between them
-    markers = list(TOP_MARKER_RE.finditer(chunk))
-    if not markers:
-        return entries
-
-    for i, m in enumerate(markers):
-        article_number = m.group(0)                   # like "(a) "
-        article_number = article_number.strip()       # "(a)"
-        article_number = article_number.strip("() ")  # "a"
-
-        start = m.end()                               # text begins after the marker + space
-        end = markers[i + 1].start() if i + 1 < len(markers) else len(chunk)
-        body = chunk[start:end].strip()
-
-        # Light cleanup of leading punctuation/dashes the OCR may capture
-        body = re.sub(r'^[–—-]\s*', '', body)
-        body = clean_noise(body)
-
-        wc = word_count(body)
-        if wc >= min_words:
-            entries.append({
-                "kb": doc_title,
-                "article_number": article_number,     # e.g., a, b, 1, i, ii
-                "type": current_section,              # the section header, e.g., "SEC. 2"
-                "text": body,
-                "word_count": wc
-            })
-        # If fewer than min_words, we skip it. This prevents outputs like text="a" (wc=1).
 
-    return entries
-
-def pdf_to_json(pdf_file: str, json_file: str, doc_title: str, min_words: int = 2):
+def pdf_to_json(pdf_file: str, json_file: str, doc_title: str, min_words: int = 2, workers: int = 1,
+                text_layer: bool = True):
     """
     OCR a law PDF into JSON entries.
     - Ignores introductory material before the enactment phrase if present.
     - Within each Section, extracts top-level markers and their bodies.
     - Skips any entry with fewer than `min_words`.
+    - Returns the number of entries written.
+    - `workers` > 1 OCRs pages in a process pool (None = one per core); output is unchanged.
+    - `text_layer` reads born-digital pages from the PDF's embedded text and OCRs only
+      scanned pages; every entry records how the document was read ("source": "text",
+      "ocr" or "mixed") and the path each page took is written to laws_json_file/pages/.
+    - Run inside `pipeline_stats.recording(...)` to get per-stage timings.
     """
-    # 1) Convert PDF pages to images and OCR
-    pages = convert_from_path(pdf_file)
-    full_text = ""
-    for page in pages:
-        full_text += pytesseract.image_to_string(page) + "\n"
-
-    # 2) Normalize & trim
-    full_text = clean_noise(full_text)
-
-    # 3) Drop introductory text
-    full_text = text_after_enactment(full_text)
-
-    # 4) Split by sections; keep headers
-    # Using split that keeps the headers: [..., "SEC. 1", "<text>", "SEC. 2", "<text>", ...]
-    parts = re.split(f'({SECTION_HDR_RE.pattern})', full_text)
-    entries = []
-    current_section = None
-
-    for part in parts:
-        if not part or not part.strip():
-            continue
-        part = part.strip()
-
-        if SECTION_HDR_RE.fullmatch(part):
-            current_section = part
-            continue
-
-        if current_section:
-            # Extract top-level article blocks inside this section
-            entries.extend(extract_articles_from_chunk(part, current_section, doc_title, min_words=min_words))
-        # If we encounter text before the first section header, we ignore it (safely skipping intros).
-
-    # 5) Save JSON
-    os.makedirs(os.path.dirname(json_file), exist_ok=True)
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(entries, f, indent=4, ensure_ascii=False)
-
-    print(f"✅ Extracted {len(entries)} entries (min {min_words} words each) → {json_file}")
-    return entries
-
-
-
-pdf_to_json("laws_pdf_file/California_state_law.pdf", "laws_json_file/California_state_law.json", "California_state_law", min_words=2)
-pdf_to_json("laws_pdf_file/EU_Digital_Service_Act.pdf", "laws_json_file/EU_Digital_Service_Act.json", "EU_Digital_Service", min_words=2)
-pdf_to_json("laws_pdf_file/The_Florida_Senate.pdf", "laws_json_file/The_Florida_Senate.json", "The_Florida_Senate", min_words=2)
-pdf_to_json("laws_pdf_file/Utah_Social_Media_Regulation_Act.pdf", "laws_json_file/Utah_Social_Media_Regulation_Act.json", "Utah_Social_Media_Regulation_Act", min_words=2)
+    # 1) Read embedded text / convert PDF pages to images and OCR (in page order)
+    page_texts, page_sources = read_pdf_pages(pdf_file, workers=workers, text_layer=text_layer)
+    full_text = join_pages(page_texts)
+    pipeline_stats.count(pages=len(page_texts), chars=len(full_text))
+
+    # 2) Normalize, drop introductory text, split by sections and extract top-level
+    #    article blocks inside each section, all in one pass (see law_parser.py)
+    entries = iter_document("california", full_text, doc_title, min_words=min_words,
+                            enactment=ENACTMENT_PHRASE)
+    entries = with_source(entries, page_sources)
+
+    # 3) Stream entries to JSON (.json array or .jsonl lines, by extension) as they're extracted
+    with stage("write"):
+        count = write_entries(json_file, timed_iter("parse", entries), allow_empty=False)
+    pipeline_stats.count(entries=count)
+    if not count:
+        print(f"⚠️  No entries parsed; {json_file} left as it was")
+        return 0
+    write_page_report(json_file, pdf_file, page_sources)
+
+    print(f"✅ Extracted {count} entries (min {min_words} words each) → {json_file}")
+    return count
+
+
+# For the whole corpus prefer `python ingest_laws.py`, which runs documents in parallel and
+# only rebuilds what changed (see laws_manifest.json)
+if __name__ == "__main__":
+    # Per-stage timings of the four documents are printed at the end
+    with recording(RunStats()) as stats:
+        with stats.document("California_state_law"):
+            pdf_to_json("laws_pdf_file/California_state_law.pdf", "laws_json_file/California_state_law.json", "California_state_law", min_words=2)
+        with stats.document("EU_Digital_Service"):
+            pdf_to_json("laws_pdf_file/EU_Digital_Service_Act.pdf", "laws_json_file/EU_Digital_Service_Act.json", "EU_Digital_Service", min_words=2)
+        with stats.document("The_Florida_Senate"):
+            pdf_to_json("laws_pdf_file/The_Florida_Senate.pdf", "laws_json_file/The_Florida_Senate.json", "The_Florida_Senate", min_words=2)
+        with stats.document("Utah_Social_Media_Regulation_Act"):
+            pdf_to_json("laws_pdf_file/Utah_Social_Media_Regulation_Act.pdf", "laws_json_file/Utah_Social_Media_Regulation_Act.json", "Utah_Social_Media_Regulation_Act", min_words=2)
+    print(stats.summary())
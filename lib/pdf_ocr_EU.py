@@ -1,104 +1,53 @@
-import os
-import re
-import json
-from pdf2image import convert_from_path
-import pytesseract
-
-# Optional: set path to tesseract if not in system PATH
-# pytesseract.pytesseract.tesseract_cmd = "/usr/local/bin/tesseract"
+import pipeline_stats
+from entry_delta import EntryDelta
+from law_io import write_entries
+from law_parser import iter_document
+from ocr_pages import read_pdf_pages, join_pages, with_source, write_page_report
+from pipeline_stats import RunStats, recording, stage, timed_iter
 
 ENACTMENT_PHRASE = "HAVE ADOPTED THIS REGULATION:"
 
-# Regex patterns
-ARTICLE_HDR_RE = re.compile(r'\bArticle\s+(\d+)\b', re.IGNORECASE)  # Article 1, Article 2
-NUMBERED_RE = re.compile(r'^\s*(\d+)\.\s+', re.MULTILINE)           # 1., 2., 3. at line start
-
-def word_count(text: str) -> int:
-    return len(re.findall(r'\b[\w\-]+\b', text))
-
-def clean_noise(s: str) -> str:
-    """Basic cleanup of OCR noise and whitespace."""
-    s = re.sub(r'\s+', ' ', s)  # collapse multiple spaces/newlines
-    return s.strip()
-
-def text_after_enactment(full_text: str) -> str:
-    """Skip everything before the enactment phrase."""
-    idx = full_text.find(ENACTMENT_PHRASE)
-    if idx != -1:
-        return full_text[idx + len(ENACTMENT_PHRASE):].strip()
-    return full_text
-
-def extract_numbered_sections(article_text: str, kb_title: str, article_header: str):
-    """Split article text into numbered sections: 1., 2., 3., etc."""
-    results = []
-    matches = list(NUMBERED_RE.finditer(article_text))
-    
-    for i, m in enumerate(matches):
-        article_number = m.group(1)
-        start = m.end()
-        end = matches[i + 1].start() if i + 1 < len(matches) else len(article_text)
-        body = article_text[start:end].strip()
-        body = clean_noise(body)
-        if word_count(body) >= 2:
-            results.append({
-                "kb": kb_title,
-                "article number": article_number,
-                "type": article_header,
-                "text": body,
-                "word count": word_count(body)
-            })
-    return results
-
-def pdf_to_json(pdf_file: str, json_file: str, kb_title: str):
-    """OCR PDF → JSON by Article and numbered sections."""
-    # 1) OCR PDF pages
-    pages = convert_from_path(pdf_file)
-    full_text = ""
-    for page in pages:
-        full_text += pytesseract.image_to_string(page) + "\n"
-
-    full_text = clean_noise(full_text)
-    full_text = text_after_enactment(full_text)
-
-    # 2) Split by Article headers
-    parts = re.split(f'({ARTICLE_HDR_RE.pattern})', full_text)
-    results = []
-    current_article_header = None
-    article_text_lines = []
-
-    for part in parts:
-        part = part.strip()
-        if not part:
-            continue
-
-        m = ARTICLE_HDR_RE.match(part)
-        if m:
-            # Save previous article
-            if current_article_header and article_text_lines:
-                article_text = "\n".join(article_text_lines)
-                results.extend(extract_numbered_sections(article_text, kb_title, current_article_header))
-            # Start new article
-            current_article_header = f"Article {m.group(1)}"
-            article_text_lines = []
-        else:
-            article_text_lines.append(part)
-
-    # Save last article
-    if current_article_header and article_text_lines:
-        article_text = "\n".join(article_text_lines)
-        results.extend(extract_numbered_sections(article_text, kb_title, current_article_header))
-
-    # 3) Save JSON
-    os.makedirs(os.path.dirname(json_file), exist_ok=True)
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4, ensure_ascii=False)
-
-    print(f"✅ Extracted {len(results)} sections → {json_file}")
-    return results
+def pdf_to_json(pdf_file: str, json_file: str, kb_title: str, workers: int = 1, text_layer: bool = True,
+                previous_json: str = None):
+    """
+    OCR PDF → JSON by Article and numbered sections. `workers` > 1 OCRs pages in parallel;
+    `text_layer` reads pages with embedded text directly and only OCRs scanned ones; each
+    entry's "source" says which ("text", "ocr" or "mixed").
+    For an amended edition only the pages that render differently are re-OCR'd (the rest
+    come from the OCR cache by page fingerprint), and the entries that are new, changed or
+    removed relative to `previous_json` (default: the last build of `json_file`) are
+    written to laws_json_file/delta/.
+    """
+    # 1) Read embedded text / OCR PDF pages
+    page_texts, page_sources = read_pdf_pages(pdf_file, workers=workers, text_layer=text_layer)
+    full_text = join_pages(page_texts)
+    pipeline_stats.count(pages=len(page_texts), chars=len(full_text))
+
+    # 2) Split by Article headers and numbered sections in one pass (see law_parser.py)
+    results = with_source(iter_document("eu", full_text, kb_title, enactment=ENACTMENT_PHRASE), page_sources)
+
+    # 3) Stream sections to JSON / JSON Lines as they're extracted
+    with EntryDelta(json_file, previous_json) as delta:
+        with stage("write"):
+            count = write_entries(json_file, timed_iter("parse", delta.track(results)), allow_empty=False)
+        pipeline_stats.count(entries=count)
+        if not count:
+            print(f"⚠️  No sections parsed; {json_file} left as it was")
+            return 0
+        counts = delta.write()
+    write_page_report(json_file, pdf_file, page_sources)
+
+    print(f"✅ Extracted {count} sections → {json_file} "
+          f"({counts['new']} new, {counts['changed']} changed, {counts['removed']} removed)")
+    return count
 
 # Example usage
-pdf_to_json(
-    "laws_pdf_file/EU_Digital_Service_Act_Copy.pdf",
-    "laws_json_file/EU_Digital_Service_Act_Copy.json",
-    kb_title="EU_Digital_Service_Act_Copy"
-)
+if __name__ == "__main__":
+    with recording(RunStats()) as stats, stats.document("EU_Digital_Service_Act_Copy"):
+        # Re-running after the PDF is amended only re-OCRs the changed pages; see laws_json_file/delta/
+        pdf_to_json(
+            "laws_pdf_file/EU_Digital_Service_Act_Copy.pdf",
+            "laws_json_file/EU_Digital_Service_Act_Copy.json",
+            kb_title="EU_Digital_Service_Act_Copy"
+        )
+    print(stats.summary())
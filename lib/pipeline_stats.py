@@ -0,0 +1,234 @@
+"""
+Per-stage timing for the PDF → JSON pipeline.
+
+    with recording(RunStats()) as stats:
+        with stats.document("The_Florida_Senate"):
+            pdf_to_json(...)
+    stats.write("run_report.json")
+
+The pipeline code calls `stage("ocr", pages=1)` / `timed_iter("parse", entries)` at each
+step; with no RunStats recording these are no-ops, so the scripts behave exactly as before.
+While recording, each stage accumulates wall time, CPU time (this process plus reaped
+children such as tesseract and pdftoppm), call count and pages/chars/entries. Stage times
+are exclusive: a stage nested in another (clean_noise inside parse, parse inside write) is
+subtracted from its parent, so the stages of a document add up to where the time went.
+
+Stages: text_layer, cache, rasterize, ocr, clean_noise, parse, write. With an OCR process
+pool the rasterize/ocr times are measured in the workers and summed, so they can exceed
+the document's wall time.
+"""
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+COUNTERS = ("pages", "chars", "entries")
+
+_active = None     # the RunStats currently recording, if any
+
+
+def cpu_seconds() -> float:
+    """User + system time of this process and of every child it has waited for."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def _new_record() -> dict:
+    return {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0}
+
+
+def _add(record: dict, wall: float, cpu: float, calls: int, counts: dict):
+    record["calls"] += calls
+    record["wall_s"] += wall
+    record["cpu_s"] += cpu
+    for key, value in counts.items():
+        record[key] = record.get(key, 0) + value
+
+
+class RunStats:
+    """Wall/CPU time and pages/chars/entries per stage and per document for one run."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.documents = {}
+        self._document = "-"        # entries recorded outside any document() go here
+        self._open = []             # [child wall, child cpu] of each stage currently running
+
+    def _doc(self, name: str = None) -> dict:
+        return self.documents.setdefault(name or self._document,
+                                         {"wall_s": 0.0, "cpu_s": 0.0, "stages": {}})
+
+    @contextmanager
+    def document(self, name: str):
+        """Attribute everything recorded inside the block to document `name`."""
+        previous, self._document = self._document, name
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        try:
+            yield self
+        finally:
+            doc = self._doc()
+            doc["wall_s"] += time.perf_counter() - wall
+            doc["cpu_s"] += cpu_seconds() - cpu
+            self._document = previous
+
+    @contextmanager
+    def stage(self, name: str, **counts):
+        self._open.append([0.0, 0.0])
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = cpu_seconds() - cpu
+            child_wall, child_cpu = self._open.pop()
+            if self._open:
+                self._open[-1][0] += wall
+                self._open[-1][1] += cpu
+            self.add(name, wall - child_wall, cpu - child_cpu, **counts)
+
+    def add(self, name: str, wall: float = 0.0, cpu: float = 0.0, calls: int = 1, **counts):
+        """Record time measured elsewhere (e.g. in an OCR worker) against stage `name`."""
+        stages = self._doc()["stages"]
+        _add(stages.setdefault(name, _new_record()), wall, cpu, calls, counts)
+
+    def count(self, **counts):
+        """Add pages/chars/entries to the current document's totals."""
+        doc = self._doc()
+        for key, value in counts.items():
+            doc[key] = doc.get(key, 0) + value
+
+    def merge(self, name: str, record: dict):
+        """Fold in a document record produced by another process's RunStats."""
+        doc = self._doc(name)
+        for key, value in record.items():
+            if key == "stages":
+                for stage_name, stage in value.items():
+                    counts = {k: v for k, v in stage.items() if k not in ("calls", "wall_s", "cpu_s")}
+                    _add(doc["stages"].setdefault(stage_name, _new_record()),
+                         stage["wall_s"], stage["cpu_s"], stage["calls"], counts)
+            elif key in COUNTERS or key.endswith("_s"):
+                doc[key] = doc.get(key, 0) + value
+            else:
+                doc[key] = value
+
+    def report(self) -> dict:
+        """The run as plain JSON-able data, with per-stage totals across documents."""
+        totals = {}
+        for doc in self.documents.values():
+            for name, stage in doc["stages"].items():
+                counts = {k: v for k, v in stage.items() if k not in ("calls", "wall_s", "cpu_s")}
+                _add(totals.setdefault(name, _new_record()), stage["wall_s"], stage["cpu_s"], stage["calls"], counts)
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_s": time.time() - self.started,
+            "cpus": os.cpu_count(),
+            "documents": self.documents,
+            "stages": totals,
+        }
+
+    def write(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def summary(self) -> str:
+        """One line per document and stage, for printing at the end of a run."""
+        lines = []
+        for name, doc in self.documents.items():
+            counts = "  ".join(f"{key}={doc[key]}" for key in COUNTERS if key in doc)
+            lines.append(f"{name}: {doc['wall_s']:.2f}s wall, {doc['cpu_s']:.2f}s cpu  {counts}")
+            for stage_name, stage in sorted(doc["stages"].items(), key=lambda s: -s[1]["wall_s"]):
+                lines.append(f"    {stage_name:<12} {stage['wall_s']:8.3f}s wall {stage['cpu_s']:8.3f}s cpu "
+                             f"x{stage['calls']}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def recording(stats: RunStats):
+    """Make `stats` the target of stage()/count() calls for the duration of the block."""
+    global _active
+    previous, _active = _active, stats
+    try:
+        yield stats
+    finally:
+        _active = previous
+
+
+def active() -> RunStats:
+    return _active
+
+
+@contextmanager
+def stage(name: str, **counts):
+    """Time the block as stage `name` of the current document, if a run is being recorded."""
+    if _active is None:
+        yield
+        return
+    with _active.stage(name, **counts):
+        yield
+
+
+def count(**counts):
+    if _active is not None:
+        _active.count(**counts)
+
+
+def add(name: str, wall: float = 0.0, cpu: float = 0.0, calls: int = 1, **counts):
+    if _active is not None:
+        _active.add(name, wall, cpu, calls, **counts)
+
+
+def timed_iter(name: str, iterable):
+    """
+    Yield from `iterable`, timing only the work done producing each item (not the
+    consumer's), as stage `name` with an `entries` count. Used to separate parsing from
+    writing when a parser generator is streamed straight into a writer.
+    """
+    if _active is None:
+        yield from iterable
+        return
+    stats, iterator = _active, iter(iterable)
+    while True:
+        with stats.stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        stats.add(name, calls=0, entries=1)
+        yield item
+
+
+@contextmanager
+def profiling(stats: RunStats, name: str, profile_dir: str = None, top: int = 10):
+    """
+    Optional deep mode for one document: cProfile to `<profile_dir>/<name>.prof` (open with
+    `python -m pstats` or snakeviz) and tracemalloc peak plus the `top` allocation sites,
+    added to the document's record. Both slow the run down noticeably.
+    """
+    if profile_dir is None:
+        yield
+        return
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profile_file = os.path.join(profile_dir, f"{name}.prof")
+        profiler.dump_stats(profile_file)
+        doc = stats._doc(name)
+        doc["profile"] = profile_file
+        doc["peak_traced_mb"] = round(peak / (1024 * 1024), 2)
+        doc["top_allocations"] = [
+            {"site": str(stat.traceback[0]), "kb": round(stat.size / 1024, 1), "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[:top]
+        ]
@@ -0,0 +1,35 @@
+"""
+Footer removal on text-layer pages, from the committed California fixture.
+
+    python -m pytest test_law_parser.py
+"""
+import json
+import os
+
+from law_parser import clean_noise, parse_document
+from ocr_pages import join_pages
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures", "California_state_law.json")
+
+
+def load_fixture() -> dict:
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_footer_in_either_order():
+    assert clean_noise("are met. Ch. 321 —2— The bill") == "are met. The bill"
+    assert clean_noise("of a minor. — 3 — Ch. 321 (c) As") == "of a minor. (c) As"
+
+
+def test_text_layer_pages_lose_their_footers():
+    fixture = load_fixture()
+    pages = [page for page, source in zip(fixture["pages"], fixture["page_sources"]) if source == "text"]
+    # Both orders are on these pages: "Ch. 321\n\n—2—" (even) and "—3—\n\nCh. 321" (odd)
+    assert any(page.startswith("Ch. 321") for page in pages)
+    assert any(page.startswith("—3—") for page in pages)
+
+    text = join_pages(pages)
+    assert "Ch. 321" not in clean_noise(text)
+    for entry in parse_document("california", text, "California_state_law"):
+        assert "Ch. 321" not in entry["text"], entry
@@ -1,93 +1,13 @@
-import re
-import json
-import os
-
-def merge_until_fullstop(chunks):
-    """
-    Merge consecutive text chunks until one ends with a full stop.
-    """
-    merged = []
-    buffer = ""
-    for chunk in chunks:
-        buffer += (" " + chunk.strip()).strip()
-        if re.search(r'[.?!]$', buffer):
-            merged.append(buffer.strip())
-            buffer = ""
-    if buffer:  # leftover without punctuation
-        merged.append(buffer.strip())
-    return merged
+from law_io import write_entries
+from law_parser import iter_document, parse_document
 
 
 def law_text_to_json(text, kb_title="Reporting_requirements_of_providers"):
-    results = []
-    current_article = None
-    current_text = []
-    section_number = None
-
-    # Regex: top-level markers (a), (b), (c) ...
-    top_marker_re = re.compile(r'^\(?([a-z])\)\s*(.*)', re.IGNORECASE)
-
-    temp_entries = []
-
-    for line in text.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-
-        m = top_marker_re.match(line)
-        if m:
-            # Save previous section (raw) to temp_entries
-            if current_article and current_text:
-                temp_entries.append((current_article, " ".join(current_text).strip(), section_number or "N/A"))
-
-            # Start new section
-            current_article = m.group(1)
-            section_number = "Section " + m.group(1)
-            current_text = [m.group(2)]
-        else:
-            # Add to current section text
-            current_text.append(line)
-
-    # Save last section
-    if current_article and current_text:
-        temp_entries.append((current_article, " ".join(current_text).strip(), section_number or "N/A"))
-
-    # Merge until full stop
-    buffer_marker = None
-    buffer_text = ""
-    buffer_section = None
-
-    for marker, text_chunk, section in temp_entries:
-        if not buffer_marker:
-            buffer_marker = marker
-            buffer_section = section
-
-        buffer_text += (" " + text_chunk).strip()
-
-        if re.search(r'[.?!]$', buffer_text):
-            # Text ends with full stop, save entry
-            results.append({
-                "kb": kb_title,
-                "article_number": buffer_marker,
-                "type": buffer_section,
-                "text": buffer_text.strip(),
-                "word_count": len(buffer_text.split())
-            })
-            buffer_text = ""
-            buffer_marker = None
-            buffer_section = None
-
-    # If any leftover text without full stop, save it anyway
-    if buffer_text:
-        results.append({
-            "kb": kb_title,
-            "article_number": buffer_marker or "?",
-            "type": buffer_section or "N/A",
-            "text": buffer_text.strip(),
-            "word_count": len(buffer_text.split())
-        })
-
-    return results
+    """
+    One entry per leaf of the nested (a)/(1)/(A)/(i)/(I) outline, with its full citation path
+    ("(d)(5)(A)(ii)(I)"), parent citation and ancestors' lead-in text (law_parser's "us_code" profile).
+    """
+    return parse_document("us_code", text, kb_title)
 
 
 if __name__ == "__main__":
@@ -187,11 +107,9 @@ A provider of a report to the CyberTipline under subsection (a)(1) may voluntari
 Not later than 1 year after the date of enactment of this paragraph, a provider of a report to the CyberTipline under subsection (a)(1) shall preserve materials under this subsection in a manner that is consistent with the most recent version of the Cybersecurity Framework developed by the National Institute of Standards and Technology, or any successor thereto.
 (Added Pub. L. 110–401, title V, § 501(a), Oct. 13, 2008, 122 Stat. 4243; amended Pub. L. 115–395, § 2, Dec. 21, 2018, 132 Stat. 5287; Pub. L. 118–59, §§ 3, 4(a), May 7, 2024, 138 Stat. 1016.)"""  # your long law text here
 
-    results = law_text_to_json(text)
-
-    os.makedirs("laws_json_file", exist_ok=True)
     output_path = "laws_json_file/Reporting_requirements_of_providers.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4, ensure_ascii=False)
+    # One entry per leaf of the (a)/(1)/(A)/(i)/(I) outline, with its full citation path
+    count = write_entries(output_path, iter_document("us_code", text, "Reporting_requirements_of_providers"),
+                          allow_empty=False)
 
-    print(f"✅ Extracted {len(results)} entries → {output_path}")
+    print(f"✅ Extracted {count} entries → {output_path}")